@@ -1,16 +1,24 @@
 # from streamlit_folium import st_folium
 # from streamlit_js_eval import get_geolocation
+import streamlit as st
 from streamlit.components.v1 import html
-from streamlit_cookies_manager import CookieManager
 import folium
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import date, timedelta
-import math
+from datetime import date, datetime, timedelta
 import json
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
 
 from func import *
-from llm import run_pipeline, run_agent
+from recommend import score_stations
+from cache import KOR
+import metrics
+from scheduler import get_scheduler
+from llm_lazy import run_agent_stream, refresh_news_stream, start_news_worker # llm 패키지는 처음 사용할 때 import
+from news_summary import get_summary_store, NEWS_REFRESH_INTERVAL
 
 st.set_page_config("유가 조회",
                    page_icon="📊")
@@ -26,29 +34,48 @@ st.set_page_config("유가 조회",
 
 st.title("유가 정보 통합조회")
 
+@st.cache_resource
+def station_harvester():
+    # 프로세스당 1회만 주유소 수집 스레드 시작
+    return start_harvester()
+if os.getenv("STATION_HARVESTER"): # 오피넷 호출 한도를 사용하므로 환경변수로 켜는 경우만 실행
+    station_harvester()
+
+@st.cache_resource
+def metrics_server(port: int):
+    # 프로세스당 1회만 Prometheus /metrics 서버 시작
+    return metrics.start_http_server(port)
+if os.getenv("METRICS_PORT"):
+    metrics_server(int(os.getenv("METRICS_PORT")))
+
 
 # --------------------------------------------
 
 
-cookies = CookieManager()
-if not cookies.ready():
-    st.stop()
-
-news_btn = st.button("AI뉴스 받아보기", type="primary")
-if news_btn:
-    with st.spinner("1~2분정도 소요됩니다..."):
-        if os.getenv("OPENAI_API_KEY"):
-            result = run_pipeline(rss="구글뉴스",
-                                  max_items_per_feed=20,
-                                  k=8,
-                                  lookback_days=7)
-            cookies["news"] = result
-            cookies.save()
-        else:
-            cookies["news"] = "**API KEY를 확인해주세요.**"
+@st.cache_resource
+def news_worker():
+    # 프로세스당 1회만 뉴스 요약 스레드 시작
+    return start_news_worker()
+if os.getenv("OPENAI_API_KEY"):
+    news_worker()
+
+news = get_summary_store().latest()
+news_stale = news is None or time.time() - news["created_at"] >= NEWS_REFRESH_INTERVAL
+if news_stale and st.button("AI뉴스 받아보기", type="primary"):
+    if os.getenv("OPENAI_API_KEY"):
+        with st.spinner("기사 수집 후 요약합니다. 1~2분정도 소요됩니다..."):
+            st.write_stream(refresh_news_stream()) # 요약은 작성되는 대로 표시
         st.rerun()
-if "news" in cookies:
-    st.markdown(cookies.get("news"))
+    else:
+        st.markdown("**API KEY를 확인해주세요.**")
+if news is not None:
+    created_at = datetime.fromtimestamp(news["created_at"], tz=KOR)
+    st.caption(f"AI뉴스 요약 ({created_at:%Y-%m-%d %H:%M} 기준, 최근 {news['lookback_days']}일)")
+    st.markdown(news["text"])
+    if news["sources"]:
+        with st.expander("출처 기사"):
+            st.markdown("\n".join(f"- [{src['title']}]({src['link']}) ({src['publish'][:10]})"
+                                   for src in news["sources"]))
 
 
 # --------------------------------------------
@@ -60,18 +87,15 @@ oil_order = ["휘발유", "경유", "LPG", "고급휘발유", "등유"]
 palette = px.colors.qualitative.D3
 colors = [palette[i % len(palette)] for i in range(len(oil_order))]
 
-if oils_today := avg_price_all():
-    oils_today.sort(key = lambda x: oil_order.index(x["PRODNM"]))
-    df = pd.DataFrame(oils_today)
-    df["DIFF_fmt"] = df["DIFF"].astype(float).map(lambda x: f"{x:+.2f}")
-
+df = avg_price_all() # 유종 출력 순서로 정렬된 데이터프레임
+if not df.empty:
     cols = st.columns(3)
-    for i, oil in enumerate(oils_today):
+    for i, oil in enumerate(df.itertuples()):
         with cols[i % 3]:
             st.metric(
-                label=oil["PRODNM"],
-                value=f'{oil["PRICE"]:,}원',
-                delta=f'{oil["DIFF"]:+.2f}원',
+                label=oil.PRODNM,
+                value=f'{oil.PRICE:,}원',
+                delta=f'{oil.DIFF:+.2f}원',
                 delta_color="inverse"
             )
 
@@ -80,7 +104,7 @@ if oils_today := avg_price_all():
         y=df["PRICE"],
         text=df["PRICE"].astype(int),
         texttemplate="%{text:.0f}원",
-        customdata=df[["DIFF_fmt"]],
+        customdata=df[["DIFF"]],
         hovertemplate=
             "<b>%{x}</b><br>" +
             "%{y:.2f}원<br>" +
@@ -109,9 +133,9 @@ st.subheader("시도별 평균 가격")
 def show_choropleth():
     selected_oil = st.selectbox("유종을 선택해주세요", oil_order, index=0)
 
-    if oils_sido := avg_price_sido():
-        oils_sido = [oil for oil in oils_sido if oil["PRODCD"]==selected_oil]
-        df = pd.DataFrame(oils_sido)
+    df = avg_price_sido()
+    if not df.empty:
+        df = df[df["PRODCD"] == selected_oil].reset_index(drop=True)
 
         with open("./gisdata/TL_SCCO_CTPRVN.json", "r", encoding="utf-8") as f:
             geo = json.load(f)
@@ -211,6 +235,11 @@ with st.sidebar.form("period_search_sidebar"): # 화면 좌측 패널 (유가 
 #             "lat": loc["coords"]["latitude"]
 #         }
 
+REC_WEIGHT_PRICE = 0.5 # AI추천 가격 가중치
+REC_WEIGHT_DISTANCE = 0.5 # AI추천 거리 가중치
+REC_TOPK = 10 # AI추천 후보 주유소 수
+REC_PREFETCH = 1 # 상세정보를 미리 조회할 주유소 수 (AI추천은 1위 주유소만 표시)
+
 if "station_search_state" not in st.session_state: # 세션 초기화 (주유소 검색)
     st.session_state["station_search_state"] = {
         "submit": False,
@@ -269,27 +298,10 @@ if period_btn: # 유가 변동 "검색" 버튼 눌렀을 때
             "end_date": end_date_btn,
         }
         with st.spinner("유가 정보 조회중..."):
-            api_once_call_limit = 7 # 오피넷API 호출시 최대 7일까지 조회가능
-            period = (end_date_btn - start_date_btn).days + 1
-            repeat = math.ceil(period / api_once_call_limit)
-
-            n = 0
-            rows: list[dict] = []
-            while n < repeat: # 조회기간이 7일 이상일시 7일단위로 나눠서 API호출
-                search_day = end_date_btn - timedelta(days=n*api_once_call_limit) # 검색날짜기준 이전 7일까지 조회가능
-                for region in selected_regions:
-                    if region == "전국":
-                        row = avg_price_all_period_search(selected_oil_period, search_day)
-                    else:
-                        row = avg_price_sido_period_search(region, selected_oil_period, search_day)
-                    rows.extend(row)
-                n += 1
-
-            df = pd.DataFrame(rows)
-            df["DATE"] = pd.to_datetime(df["DATE"].astype(str), format="%Y%m%d") # 데이터프레임 타입 변환 obj => datetime
-            df = df.loc[df["DATE"].dt.date.between(start_date_btn, end_date_btn)]
-            df = df.sort_values(by=["DATE", "AREA_NM"])
-            df["DATE"] = df["DATE"].dt.strftime("%Y-%m-%d") # 출력 포맷 변환
+            df = avg_price_period_search(selected_regions,
+                                         selected_oil_period,
+                                         start_date_btn,
+                                         end_date_btn)
             st.session_state["period_search_state"]["dataframe"] = df
 
 
@@ -363,7 +375,9 @@ if station_addr_btn: # 주유소 검색 "검색" 버튼 눌렀을 때
                                                         selected_oil_station,
                                                         sort_radio)
                 if result:
-                    st.session_state["station_search_state"]["dataframe"] = pd.DataFrame(station)
+                    st.session_state["station_search_state"]["dataframe"] = station
+                    best = score_stations(station, REC_WEIGHT_PRICE, REC_WEIGHT_DISTANCE, REC_PREFETCH)
+                    prefetch_station_info(best["UNI_ID"]) # AI추천에 표시될 주유소 상세정보 미리 조회
                 else:
                     st.session_state["station_search_state"]["dataframe"] = None
 
@@ -502,61 +516,57 @@ if session["submit"] and session["dataframe"] is not None:
             </html>
             """, height=500)
 
-    df["PRICE"] = pd.to_numeric(df["PRICE"]).map(lambda x: int(x))  # 형변환
-    df["DISTANCE"] = pd.to_numeric(df["DISTANCE"]).map(lambda x: int(x))  # 형변환
     if sort == 1:  # 정렬기준이 가격순일때 같은 가격이라면 가까운 거리순으로 정렬
         df = df.sort_values(by=["PRICE", "DISTANCE"])
 
-    df.rename(columns={
+    # session["dataframe"]은 AI추천, 그래프에서 원래 컬럼명으로 다시 쓰므로 inplace로 바꾸지 않음
+    df = df.rename(columns={
         "UNI_ID": "station_id",
         "POLL_DIV_CD": "상표",
         "OS_NM": "주유소명",
-        "PRICE": "가격",
-        "DISTANCE": "거리",
+        "PRICE": "가격(원)",
+        "DISTANCE": "거리(m)",
         "PRODCD": "유종"
-    }, inplace=True)
-    df["가격"] = df["가격"].map(lambda x: f"{x:,}원")
-    df["거리"] = df["거리"].map(lambda x: f"{x:,}m")
-    df = df[["station_id", "상표", "주유소명", "가격", "거리", "유종"]]
+    })
+    df = df[["station_id", "상표", "주유소명", "가격(원)", "거리(m)", "유종"]]
 
     @st.fragment
     def show_ai_recommend():
         if st.button("AI추천 주유소", type="primary", disabled=session["rec_btn_run_lock"]):
-            with st.spinner("추천 중입니다..."):
-                if os.getenv("OPENAI_API_KEY"):
-                    result = run_agent(
-                        stations=df.to_dict("records"),
-                        weight_price=0.5,
-                        weight_distance=0.5,
-                        topk=10,
-                    )
-                    session["rec"] = result
-                    session["rec_btn_run_lock"] = True
-                else:
-                    session["rec"] = "**OPEN API KEY를 확인해주세요**"
-                st.rerun()
+            # 점수 계산으로 주유소를 고르고 OPENAI API키가 없으면 템플릿으로 안내, 작성되는 대로 표시
+            result = st.write_stream(run_agent_stream(
+                stations=session["dataframe"],
+                weight_price=REC_WEIGHT_PRICE,
+                weight_distance=REC_WEIGHT_DISTANCE,
+                topk=REC_TOPK,
+            ))
+            session["rec"] = result
+            session["rec_btn_run_lock"] = True
+            st.rerun()
     show_ai_recommend()
     if session["rec"]:
         st.markdown((session["rec"]))
 
     df.index = pd.RangeIndex(1, len(df)+1)
-    st.dataframe(df.iloc[:, 1:])
-
-    district = xy_to_district(lon, lat)
+    st.dataframe(df.iloc[:, 1:],
+                 column_config={
+                     "가격(원)": st.column_config.NumberColumn(format="localized"),
+                     "거리(m)": st.column_config.NumberColumn(format="%d")
+                 })
+
+    import reverse_geocoder # geopandas를 import하므로 시작할 때가 아니라 처음 사용할 때 import
+    district = reverse_geocoder.xy_to_district(lon, lat) or xy_to_district(lon, lat) # 로컬 경계 데이터에 없거나 근사한 시군구 경계 근처면 카카오 API
     sido = district[1]["region_1depth_name"]
     sigun = district[1]["region_2depth_name"]
 
-    sido_code = bidict(get_opinet_region_code()).inv[sido]
-    sigun_code = get_opinet_region_code(sido_code)
-    for i in sigun_code:
-        if i["AREA_NM"] == sigun:
-            sigun_code = i["AREA_CD"]
+    region_index = get_region_index()
+    sido_code = region_index.sido_code(sido)
+    sigun_code = region_index.sigun_code(sido_code, sigun)
 
-    price_sido = 0
-    for i in avg_price_sido():
-        if i["SIDOCD"] == sido_code and i["PRODCD"] == oil:
-            price_sido = int(i["PRICE"])
-    price_sigun = int(avg_price_sigun(sido_code, sigun_code, oil)[0]["PRICE"])
+    df_sido = avg_price_sido()
+    match = df_sido.loc[(df_sido["SIDOCD"] == sido_code) & (df_sido["PRODCD"] == oil), "PRICE"]
+    price_sido = int(match.iloc[0]) if not match.empty else 0
+    price_sigun = int(avg_price_sigun(sido_code, sigun_code, oil)["PRICE"].iloc[0])
 
     df_graph = session["dataframe"]
     price_min = int(df_graph["PRICE"].min())
@@ -596,4 +606,23 @@ if session["submit"] and session["dataframe"] is not None:
     st.plotly_chart(fig, use_container_width=True)
 
 elif session["submit"] and session["dataframe"] is None:
-    st.info("반경내 주유소가 없습니다.")
\ No newline at end of file
+    st.info("반경내 주유소가 없습니다.")
+
+# --------------------------------------------
+# 관리자 지표 패널 (?admin=ADMIN_TOKEN 으로 접속한 경우만)
+
+
+admin_token = os.getenv("ADMIN_TOKEN")
+if admin_token and st.query_params.get("admin") == admin_token:
+    with st.sidebar.expander("지표 (관리자)"):
+        report = metrics.summary()
+        st.caption("API 일일 호출 한도")
+        st.dataframe(pd.DataFrame(get_scheduler().status()), hide_index=True)
+        st.caption("외부 호출 (p50, p95 : 초)")
+        st.dataframe(pd.DataFrame(report["calls"]), hide_index=True)
+        st.caption("캐시 적중률")
+        st.dataframe(pd.DataFrame(report["caches"]), hide_index=True,
+                     column_config={"hit_rate": st.column_config.ProgressColumn(min_value=0, max_value=1)})
+        st.caption("llm 토큰 사용량")
+        st.dataframe(pd.DataFrame(report["tokens"]), hide_index=True)
+        st.code(metrics.render_prometheus(), language="text")
@@ -0,0 +1,45 @@
+"""
+로컬 좌표계 변환(projection) 확인
+record_fixtures.py가 카카오 transcoord API(KTM => WGS84)로 기록한 표본 좌표와 pyproj 변환 결과를 비교해서
+최대 오차가 projection.TOLERANCE_M 안인지 확인 (넘으면 종료코드 1)
+표본 파일이 없으면 비교하지 않고 건너뜀 (종료코드 0)
+
+실행 : python bench/check_projection.py
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+SAMPLES_PATH = os.path.join(ROOT, "bench", "fixtures", "kakao", "ktm_samples.json")
+M_PER_DEG = 111_320
+
+def main() -> int:
+    import projection
+
+    if not os.path.exists(SAMPLES_PATH):
+        print(f"SKIP : 카카오 변환 표본 없음 ({SAMPLES_PATH}), python bench/record_fixtures.py로 기록")
+        return 0
+    with open(SAMPLES_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)["samples"]
+    x = [s["x"] for s in samples]
+    y = [s["y"] for s in samples]
+    lon, lat = projection.katec_to_wgs84(x, y)
+    kakao_lon = np.array([s["lon"] for s in samples])
+    kakao_lat = np.array([s["lat"] for s in samples])
+    error = np.hypot((lon - kakao_lon) * M_PER_DEG * np.cos(np.radians(kakao_lat)), (lat - kakao_lat) * M_PER_DEG)
+    for s, e in zip(samples, error):
+        print(f"({s['x']}, {s['y']}) 카카오 ({s['lon']:.6f}, {s['lat']:.6f}) 오차 {e:.1f}m")
+
+    print(f"최대 오차 {error.max():.1f}m, 평균 {error.mean():.1f}m (허용 {projection.TOLERANCE_M}m)")
+    if error.max() > projection.TOLERANCE_M:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+로컬 행정구역 검색(reverse_geocoder) 확인
+시도별 시청/도청 소재지 좌표가 기대한 시도, 시군구로 나오는지, 경계 폴리곤이 모두 올바른지 확인 (틀리면 종료코드 1)
+근사한 시군구 경계 근처라서 None이면 앱은 카카오 API로 찾으므로 통과 (KAKAO로 표시), 다른 시군구가 나오면 실패
+
+실행 : python bench/check_regions.py
+"""
+import os
+import sys
+
+import shapely
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# (경도, 위도) : (시도, 시군구) - 시군구가 있는 도는 도청 소재지 시청
+CITY_HALLS = {
+    (126.9779, 37.5663): ("서울특별시", "중구"),
+    (129.0756, 35.1796): ("부산광역시", "연제구"),
+    (128.6014, 35.8714): ("대구광역시", "중구"),
+    (126.7052, 37.4563): ("인천광역시", "남동구"),
+    (126.8526, 35.1601): ("광주광역시", "서구"),
+    (127.3845, 36.3504): ("대전광역시", "서구"),
+    (129.3114, 35.5396): ("울산광역시", "남구"),
+    (127.2890, 36.4800): ("세종특별자치시", "세종특별자치시"),
+    (127.0286, 37.2636): ("경기도", "수원시 팔달구"),
+    (127.7298, 37.8813): ("강원도", "춘천시"),
+    (127.4890, 36.6424): ("충청북도", "청주시 상당구"),
+    (126.6728, 36.6588): ("충청남도", "홍성군"),
+    (127.1480, 35.8242): ("전라북도", "전주시 완산구"),
+    (126.4629, 34.8161): ("전라남도", "무안군"),
+    (128.7294, 36.5684): ("경상북도", "안동시"),
+    (128.6811, 35.2280): ("경상남도", "창원시 성산구"),
+    (126.5312, 33.4996): ("제주특별자치도", "제주시"),
+}
+
+def main() -> int:
+    os.chdir(ROOT) # reverse_geocoder는 ./gisdata 상대경로 사용
+    import reverse_geocoder
+
+    failed = []
+    sido_layer, sigungu_layer = reverse_geocoder._layers()
+    if sigungu_layer is None:
+        failed.append(f"시군구 경계 파일 없음 : {reverse_geocoder.SIGUNGU_PATH}")
+    for name, layer in (("시도", sido_layer), ("시군구", sigungu_layer)):
+        if layer is not None and not shapely.is_valid(layer.geoms).all():
+            failed.append(f"{name} 경계에 잘못된 폴리곤이 있음")
+
+    for (x, y), expected in CITY_HALLS.items():
+        district = reverse_geocoder.xy_to_district(x, y)
+        got = (district[0]["region_1depth_name"], district[0]["region_2depth_name"]) if district else None
+        mark = "OK" if got == expected else "KAKAO" if got is None else "FAIL"
+        print(f"{mark:<6}({x}, {y}) {' '.join(expected):<24} => {' '.join(got) if got else None}")
+        if mark == "FAIL":
+            failed.append(" ".join(expected))
+
+    if failed:
+        print(f"FAIL : {', '.join(failed)}")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
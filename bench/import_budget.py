@@ -0,0 +1,66 @@
+"""
+화면(app.py) 시작 import 시간 점검
+app.py가 시작할 때 import하는 로컬 모듈이 무거운 패키지(llm, 경계 데이터, KD-tree)를 끌어오지 않는지,
+import 시간이 예산 안인지 확인 (실패하면 종료코드 1)
+import 시간은 새 인터프리터에서 MODULES 전체를 한번에 import하는 벽시계 시간의 RUNS회 중앙값
+streamlit, folium, plotly와 streamlit이 먼저 import하는 PRELOADED 패키지는 화면 자체에 필요하므로 측정하지 않음
+
+실행 : python bench/import_budget.py [--budget-ms 100] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app.py가 시작할 때 import하는 로컬 모듈
+MODULES = ["func", "recommend", "cache", "metrics", "scheduler", "llm_lazy", "news_summary"]
+FORBIDDEN = ["langchain", "langchain_core", "langchain_openai", "langchain_chroma", "chromadb",
+             "openai", "trafilatura", "feedparser", "googlenewsdecoder", "llm", "news_store",
+             "geopandas", "shapely", "scipy", "reverse_geocoder", "station_index"]
+PRELOADED = ["numpy", "pandas", "requests"] # streamlit이 먼저 import하는 패키지
+BUDGET_MS = 100 # MODULES 전체 import 시간 예산
+RUNS = 5 # 새 인터프리터에서 측정하는 횟수 (중앙값 사용)
+
+_MEASURE = """
+import json, sys, time
+import {preloaded}
+start = time.perf_counter()
+import {modules}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+def measure(modules: list[str]) -> tuple[float, set[str]]:
+    """PRELOADED를 import한 뒤 modules를 한번에 import하는 벽시계 시간(ms)과 import된 모듈 목록, 새 인터프리터에서 측정"""
+    code = _MEASURE.format(preloaded=", ".join(PRELOADED), modules=", ".join(modules))
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    data = json.loads(result.stdout.splitlines()[-1])
+    return data["ms"], set(data["modules"])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    runs = [measure(MODULES) for _ in range(args.runs)]
+    total_ms = statistics.median(ms for ms, _ in runs)
+    loaded = sorted(m for m in FORBIDDEN if any(m in modules for _, modules in runs))
+    print(f"{', '.join(MODULES)} : {total_ms:.1f}ms ({args.runs}회 중앙값, 예산 {args.budget_ms:.0f}ms)")
+    ok = True
+    if loaded:
+        print(f"FAIL 시작할 때 import하면 안되는 모듈 : {', '.join(loaded)}")
+        ok = False
+    if total_ms > args.budget_ms:
+        print("FAIL import 시간 예산 초과")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+스텁 서버 응답 파일 갱신
+.env의 API키로 실제 오피넷/카카오맵 API를 호출해서 bench/fixtures에 저장 (RSS, 기사 HTML은 직접 관리)
+저장소에 들어있는 fixtures는 API 문서의 응답 형식에 맞춰 직접 만든 합성 데이터 (값은 실제 응답이 아님)
+이 스크립트를 실행하면 실제 응답으로 덮어씀, 벤치 기준값(baselines.json)도 다시 측정해야 함
+KTM_SAMPLES 좌표의 카카오 KTM => WGS84 변환 결과는 kakao/ktm_samples.json에 저장 (bench/check_projection.py에서 사용)
+
+실행 : python bench/record_fixtures.py
+"""
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+from client import opinet, kakao
+
+# 전국에 흩어진 KATEC 좌표 (서울, 부산, 광주, 안동, 춘천, 제주, 포항, 무안 부근)
+KTM_SAMPLES = [(309901, 552051), (498165, 287275), (295665, 285182), (465480, 441074),
+               (376425, 586555), (263722, 101365), (523232, 380731), (259573, 247496)]
+
+def _requests() -> list[tuple]:
+    yesterday = (date.today() - timedelta(days=1)).strftime("%Y%m%d")
+    return [
+        (opinet, "avgAllPrice.do", {}, "opinet/avgAllPrice.do.json"),
+        (opinet, "avgSidoPrice.do", {}, "opinet/avgSidoPrice.do.json"),
+        (opinet, "avgSigunPrice.do", {"sido": "01", "prodcd": "B027"}, "opinet/avgSigunPrice.do.json"),
+        (opinet, "areaCode.do", {}, "opinet/areaCode.do.json"),
+        (opinet, "areaCode.do", {"area": "01"}, "opinet/areaCode.do__area.json"),
+        (opinet, "dateAreaAvgRecentPrice.do", {"area": "01", "prodcd": "B027", "date": yesterday},
+         "opinet/dateAreaAvgRecentPrice.do.json"),
+        (opinet, "dateAvgRecentPrice.do", {"prodcd": "B027", "date": yesterday}, "opinet/dateAvgRecentPrice.do.json"),
+        (opinet, "aroundAll.do", {"x": 309946, "y": 552085, "radius": 5000, "prodcd": "B027", "sort": 1},
+         "opinet/aroundAll.do.json"),
+        (kakao, "geo/transcoord.json", {"x": 309946, "y": 552085, "input_coord": "KTM", "output_coord": "WGS84"},
+         "kakao/geo/transcoord.json"),
+        (kakao, "geo/coord2regioncode.json", {"x": 126.9779, "y": 37.5663}, "kakao/geo/coord2regioncode.json"),
+        (kakao, "search/address.json", {"query": "서울 중구 세종대로 110"}, "kakao/search/address.json"),
+    ]
+
+def save(path: str, data: dict) -> None:
+    path = os.path.join(BENCH_DIR, "fixtures", path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    print(f"저장 : {path}")
+
+def main() -> None:
+    for client, endpoint, params, path in _requests():
+        save(path, client().get(endpoint, params))
+
+    # 상세정보는 반경 검색 결과의 첫번째 주유소
+    with open(os.path.join(BENCH_DIR, "fixtures", "opinet/aroundAll.do.json"), "r", encoding="utf-8") as f:
+        station_id = json.load(f)["RESULT"]["OIL"][0]["UNI_ID"]
+    save("opinet/detailById.do.json", opinet().get("detailById.do", {"id": station_id}))
+
+    samples = []
+    for x, y in KTM_SAMPLES:
+        params = {"x": x, "y": y, "input_coord": "KTM", "output_coord": "WGS84"}
+        doc = kakao().get("geo/transcoord.json", params)["documents"][0]
+        samples.append({"x": x, "y": y, "lon": doc["x"], "lat": doc["y"]})
+    save("kakao/ktm_samples.json", {"samples": samples})
+    print(f"scenarios.STATION_ID를 {station_id}로 바꾸세요.")
+
+if __name__ == "__main__":
+    main()
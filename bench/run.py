@@ -0,0 +1,137 @@
+"""
+오프라인 벤치마크
+로컬 스텁 서버(stub_server.StubServer)로 오피넷/카카오맵/RSS 응답을 재생하면서 시나리오(scenarios.py)별 실행시간을 측정하고
+저장된 기준값(baselines.json)의 중앙값보다 tolerance 이상 느려지면 실패 (종료코드 1)
+API키, 네트워크 없이 실행되며 저장소 파일(DB, 색인)은 임시 디렉토리에 만듦
+
+실행 : python bench/run.py                   # 기준값과 비교
+      python bench/run.py -k period          # 이름에 period가 들어간 시나리오만
+      python bench/run.py --save-baseline    # 현재 결과를 기준값으로 저장
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+LATENCY_MS = 20 # 스텁 서버 요청당 지연시간 (네트워크 왕복 가정)
+ROUNDS = 5
+TOLERANCE = 0.5 # 기준값 대비 허용 증가율
+MIN_SLACK_MS = 5 # 아주 짧은 시나리오의 측정 오차 허용치
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+from stub_server import FIXTURE_DIR, StubServer
+
+def _prepare_workdir() -> str:
+    """임시 작업 디렉토리 (./gisdata는 저장소 파일 링크, 없는 파일은 fixtures/gisdata에서)"""
+    workdir = tempfile.mkdtemp(prefix="oil-bench-")
+    gisdata = os.path.join(workdir, "gisdata")
+    os.makedirs(gisdata)
+    for src_dir in (os.path.join(FIXTURE_DIR, "gisdata"), os.path.join(ROOT, "gisdata")):
+        for name in os.listdir(src_dir):
+            dst = os.path.join(gisdata, name)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.symlink(os.path.join(src_dir, name), dst)
+    return workdir
+
+def measure(scenario, rounds: int) -> dict:
+    """1회 워밍업(import, 경계 데이터 로딩 등) 후 rounds회 측정 (초)"""
+    scenario.setup()
+    scenario.run()
+    times = []
+    for _ in range(rounds):
+        scenario.setup()
+        start = time.perf_counter()
+        scenario.run()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "rounds": rounds,
+        "min": times[0],
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": times[-1]
+    }
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="keyword", help="이름에 keyword가 들어간 시나리오만 실행")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    server = StubServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000).start()
+    os.environ.update({
+        "BENCH_BASE_URL": server.base_url,
+        "OPINET_API_BASE_URL": f"{server.base_url}/opinet",
+        "KAKAO_API_BASE_URL": f"{server.base_url}/kakao",
+        "OPINET_API_KEY": "bench",
+        "KAKAO_REST_KEY": "bench",
+        # 스텁 서버는 호출 한도가 없으므로 scheduler의 대기, 한도초과가 측정에 섞이지 않게 함
+        "OPINET_RATE_LIMIT": "10000",
+        "OPINET_DAILY_QUOTA": "100000000",
+        "KAKAO_RATE_LIMIT": "10000",
+        "KAKAO_DAILY_QUOTA": "100000000"
+    })
+    workdir = _prepare_workdir()
+    os.chdir(workdir)
+    from scenarios import SCENARIOS # 환경변수 설정 후 import (client.py가 import할 때 API 주소를 읽음)
+
+    baseline = load_baseline()
+    compare = baseline.get("latency_ms") == args.latency_ms and not args.save_baseline
+    if baseline and not compare and not args.save_baseline:
+        print(f"기준값의 지연시간({baseline.get('latency_ms')}ms)이 달라 비교하지 않음")
+
+    results = {}
+    failed = []
+    print(f"{'scenario':<32}{'median':>10}{'min':>10}{'max':>10}{'baseline':>10}")
+    for name, scenario in SCENARIOS.items():
+        if args.keyword and args.keyword not in name:
+            continue
+        result = measure(scenario, scenario.rounds or args.rounds)
+        results[name] = result
+        base = baseline.get("scenarios", {}).get(name) if compare else None
+        line = f"{name:<32}{result['median']*1000:>8.1f}ms{result['min']*1000:>8.1f}ms{result['max']*1000:>8.1f}ms"
+        if base is not None:
+            limit = max(base["median"] * (1 + args.tolerance), base["median"] + MIN_SLACK_MS / 1000)
+            line += f"{base['median']*1000:>8.1f}ms"
+            if result["median"] > limit:
+                line += "  FAIL"
+                failed.append(name)
+        print(line)
+    server.stop()
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        saved = baseline.get("scenarios", {}) if baseline.get("latency_ms") == args.latency_ms else {}
+        saved.update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"latency_ms": args.latency_ms, "scenarios": saved}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"기준값 저장 : {BASELINE_PATH}")
+    if failed:
+        print(f"FAIL 기준값보다 느려진 시나리오 : {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
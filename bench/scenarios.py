@@ -0,0 +1,146 @@
+"""
+벤치마크 시나리오
+setup(측정 제외)에서 캐시와 로컬 저장소를 비워서 매 라운드 API(스텁 서버) 호출 경로를 측정
+bench/run.py가 스텁 서버 주소를 환경변수로 설정하고 임시 작업 디렉토리로 이동한 뒤 import
+"""
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+
+import func
+import geocode_store
+import price_store
+import reverse_geocoder
+import station_index
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], None]
+    rounds: int | None = None # None이면 run.py의 --rounds
+
+SCENARIOS: dict[str, Scenario] = {}
+
+def _remove(path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def reset() -> None:
+    """func의 ttl_cache 캐시, 주유소 색인, 기간조회 저장소, 주소 좌표 저장소 초기화"""
+    for obj in vars(func).values():
+        if callable(obj) and hasattr(obj, "__wrapped__") and hasattr(obj, "clear"):
+            obj.clear()
+    func._station_index = None
+    _remove(station_index.STATION_INDEX_PATH)
+    _remove(price_store.HISTORY_DB_PATH)
+    geocode_store._store = None
+    _remove(geocode_store.GEOCODE_DB_PATH)
+
+def scenario(name: str, setup: Callable[[], None] = reset, rounds: int | None = None) -> Callable:
+    def decorator(run: Callable) -> Callable:
+        SCENARIOS[name] = Scenario(name, run, setup, rounds)
+        return run
+    return decorator
+
+LON, LAT = 126.9779, 37.5663 # 서울시청
+ADDRESS = "서울 중구 세종대로 110"
+STATION_ID = "A0001000"
+PERIOD_REGIONS = ["전국", "서울특별시", "경기도"]
+PERIOD_DAYS = 30
+
+# --------------------------------------------
+# func.py 조회 함수별
+
+@scenario("avg_price_all")
+def _():
+    return func.avg_price_all()
+
+@scenario("avg_price_sido")
+def _():
+    return func.avg_price_sido()
+
+@scenario("avg_price_sigun")
+def _():
+    return func.avg_price_sigun("01", "0102", "휘발유")
+
+@scenario("avg_price_sido_period_search")
+def _():
+    return func.avg_price_sido_period_search("서울특별시", "휘발유", date.today() - timedelta(days=1))
+
+@scenario("avg_price_all_period_search")
+def _():
+    return func.avg_price_all_period_search("휘발유", date.today() - timedelta(days=1))
+
+@scenario("get_opinet_region_code")
+def _():
+    return func.get_opinet_region_code()
+
+@scenario("region_index_fetch")
+def _():
+    return func.RegionIndex.fetch()
+
+@scenario("around_station_search")
+def _():
+    return func.around_station_search(LON, LAT, 3000, "휘발유", 1)
+
+@scenario("station_info_search")
+def _():
+    return func.station_info_search(STATION_ID)
+
+@scenario("address_to_gis")
+def _():
+    return func.address_to_gis(ADDRESS)
+
+@scenario("address_to_gis_variants")
+def _():
+    """표기만 다른 주소 (API 1회 + 저장소 조회)"""
+    return [func.address_to_gis(addr) for addr in (ADDRESS, "서울특별시 중구 세종대로110", " 서울  중구 세종대로 110")]
+
+@scenario("xy_to_district")
+def _():
+    return func.xy_to_district(LON, LAT)
+
+@scenario("katec_to_wgs84")
+def _():
+    return func.katec_to_wgs84(309946.0, 552085.0)
+
+# --------------------------------------------
+# 화면 단위
+
+@scenario("period_search")
+def _():
+    """기간조회 루프 (지역 3곳 x 30일, 저장소가 빈 상태)"""
+    end = date.today() - timedelta(days=1)
+    return func.avg_price_period_search(PERIOD_REGIONS, "휘발유", end - timedelta(days=PERIOD_DAYS - 1), end)
+
+@scenario("home_page")
+def _():
+    """첫 화면 (전국, 시도별 평균가격)"""
+    return func.avg_price_all(), func.avg_price_sido()
+
+@scenario("station_search_flow")
+def _():
+    """주소 검색 => 반경내 주유소 => 행정구역 => 시도/시군구 평균가격 => 1위 주유소 상세정보 (app.REC_PREFETCH)"""
+    lon, lat = map(float, func.address_to_gis(ADDRESS))
+    stations, _ = func.around_station_search(lon, lat, 3000, "휘발유", 1)
+    district = reverse_geocoder.xy_to_district(lon, lat) or func.xy_to_district(lon, lat)
+    index = func.get_region_index()
+    sido_code = index.sido_code(district[0]["region_1depth_name"])
+    sigun_code = index.sigun_code(sido_code, district[0]["region_2depth_name"])
+    func.avg_price_sido()
+    func.avg_price_sigun(sido_code, sigun_code, "휘발유")
+    for future in func.prefetch_station_info(stations["UNI_ID"].head(1)):
+        future.result()
+
+# --------------------------------------------
+# 뉴스 수집 (llm.py import, 본문 추출 프로세스풀 시작은 첫 라운드 전에 워밍업에서 끝남)
+
+RSS_FEED_PATH = "/rss/feed.xml"
+
+@scenario("fetch_articles_from_rss", setup=lambda: None)
+def _():
+    import llm
+    return llm.fetch_articles_from_rss(os.environ["BENCH_BASE_URL"] + RSS_FEED_PATH, max_items_per_feed=20)
@@ -0,0 +1,186 @@
+"""
+오피넷 / 카카오맵 / RSS 로컬 스텁 서버
+bench/fixtures에 저장된 응답(직접 만든 합성 데이터, 실제 응답은 record_fixtures.py로 기록)을 그대로 돌려주고 요청마다 지연시간(latency + 0~jitter)을 넣음
+slow_ratio 비율의 요청은 slow_latency초를 더 지연(꼬리 지연), error_ratio 비율의 요청은 503 응답
+
+경로 => 응답 파일
+/opinet/avgAllPrice.do?...          => fixtures/opinet/avgAllPrice.do.json (확장자가 없거나 .do면 .json)
+/kakao/geo/transcoord.json?...      => fixtures/kakao/geo/transcoord.json
+/rss/feed.xml, /rss/articles/1.html => fixtures/rss/feed.xml, fixtures/rss/articles/1.html
+쿼리 파라미터별 응답은 {파일명}__{키}={값}, {파일명}__{키} 순으로 찾고 없으면 기본 파일 (ex. areaCode.do__area.json)
+디렉토리에 파일이 없으면 _default 파일 (ex. rss/articles/_default.html)
+
+텍스트 응답의 {{BASE_URL}}, {{NAME}}(요청한 파일명), {{NOW_RFC822}}는 요청시 값으로 바꾸고
+오피넷 기간조회(date 파라미터)는 DATE를 기준일부터 이전 날짜로 바꿔서 반환
+
+실행 : python bench/stub_server.py --port 8700 --latency-ms 50 --jitter-ms 20 --slow-ratio 0.05 --slow-ms 1000
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CONTENT_TYPES = {
+    ".json": "application/json; charset=utf-8",
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".html": "text/html; charset=utf-8"
+}
+
+def _shift_dates(data: dict, day: str) -> dict:
+    """기간조회 응답의 DATE를 기준일(day)부터 하루씩 이전 날짜로 변경 (최근 날짜가 기준일)"""
+    end = datetime.strptime(day.replace("-", ""), "%Y%m%d").date()
+    rows = data.get("RESULT", {}).get("OIL", [])
+    dates = sorted({row["DATE"] for row in rows if "DATE" in row}, reverse=True)
+    mapping = {old: (end - timedelta(days=n)).strftime("%Y%m%d") for n, old in enumerate(dates)}
+    for row in rows:
+        if "DATE" in row:
+            row["DATE"] = mapping[row["DATE"]]
+    return data
+
+class StubServer:
+    """
+    latency, jitter : 요청마다 latency + uniform(0, jitter)초 지연
+    route_latency : 경로 접두어별 지연시간(초), latency 대신 사용 ex) {"/opinet/aroundAll.do": 0.2}
+    slow_ratio, slow_latency : slow_ratio 비율의 요청에 slow_latency초를 더함
+    error_ratio : 503으로 응답할 요청 비율
+    실행 중에도 속성을 바꾸면 다음 요청부터 적용
+    """
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 route_latency: dict | None = None,
+                 fixture_dir: str = FIXTURE_DIR,
+                 slow_ratio: float = 0.0,
+                 slow_latency: float = 0.0,
+                 error_ratio: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.route_latency = route_latency or {}
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency
+        self.error_ratio = error_ratio
+        self.fixture_dir = fixture_dir
+        self.requests: dict[str, int] = {} # 경로별 요청 수
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def delay(self, path: str) -> float:
+        base = next((v for prefix, v in self.route_latency.items() if path.startswith(prefix)), self.latency)
+        slow = self.slow_latency if random.random() < self.slow_ratio else 0.0
+        return base + random.uniform(0, self.jitter) + slow
+
+    def resolve(self, path: str, params: dict) -> str | None:
+        """요청 경로, 파라미터에 맞는 응답 파일 경로 (없으면 None)"""
+        file_path = os.path.normpath(os.path.join(self.fixture_dir, path.lstrip("/")))
+        if not file_path.startswith(self.fixture_dir):
+            return None
+        root, ext = os.path.splitext(file_path)
+        base, suffix = (root, ext) if ext in CONTENT_TYPES else (file_path, ".json") # 오피넷 .do는 JSON 파일
+        candidates = [f"{base}__{k}={v}{suffix}" for k, v in sorted(params.items())]
+        candidates += [f"{base}__{k}{suffix}" for k in sorted(params)]
+        candidates += [f"{base}{suffix}", os.path.join(os.path.dirname(file_path), f"_default{suffix}")]
+        return next((c for c in candidates if os.path.isfile(c)), None)
+
+    def render(self, path: str, params: dict) -> tuple[int, str, bytes]:
+        fixture = self.resolve(path, params)
+        if fixture is None:
+            return 404, "application/json; charset=utf-8", b'{"error": "no fixture"}'
+        with open(fixture, "r", encoding="utf-8") as f:
+            text = f.read()
+        text = (text.replace("{{BASE_URL}}", self.base_url)
+                    .replace("{{NAME}}", os.path.splitext(os.path.basename(path))[0])
+                    .replace("{{NOW_RFC822}}", format_datetime(datetime.now().astimezone())))
+        if fixture.endswith(".json") and "date" in params:
+            text = json.dumps(_shift_dates(json.loads(text), params["date"]), ensure_ascii=False)
+        return 200, CONTENT_TYPES[os.path.splitext(fixture)[1]], text.encode("utf-8")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive
+
+            def setup(self):
+                super().setup()
+                # 헤더와 본문을 따로 보내므로 Nagle 알고리즘을 끄지 않으면 응답마다 delayed ACK(~40ms)만큼 늦어짐
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = dict(parse_qsl(url.query))
+                with server._lock:
+                    server.requests[url.path] = server.requests.get(url.path, 0) + 1
+                time.sleep(server.delay(url.path))
+                if random.random() < server.error_ratio:
+                    status, content_type, body = 503, "application/json; charset=utf-8", b'{"error": "unavailable"}'
+                else:
+                    status, content_type, body = server.render(url.path, params)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--slow-ratio", type=float, default=0)
+    parser.add_argument("--slow-ms", type=float, default=0)
+    parser.add_argument("--error-ratio", type=float, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000,
+                        slow_ratio=args.slow_ratio, slow_latency=args.slow_ms / 1000, error_ratio=args.error_ratio)
+    print(f"OPINET_API_BASE_URL={server.base_url}/opinet")
+    print(f"KAKAO_API_BASE_URL={server.base_url}/kakao")
+    print(f"RSS : {server.base_url}/rss/feed.xml")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+꼬리 지연 / 장애 대응 측정 (resilience.py)
+1. 헤징 : 스텁 서버가 slow_ratio 비율의 요청을 slow_ms만큼 늦게 응답할 때
+   카카오 좌표 변환을 헤징 켜고/끄고 각각 순서대로 호출해서 p50/p95/p99 비교
+2. 서킷 브레이커 : 모든 요청이 503일 때 연속 호출의 호출당 시간 비교 (브레이커 켜고/끄고)
+헤징한 p99가 헤징하지 않은 p99보다 작지 않거나 브레이커가 열린 뒤에도 호출이 느리면 실패 (종료코드 1)
+
+실행 : python bench/tail_latency.py
+      python bench/tail_latency.py --requests 500 --slow-ratio 0.02 --slow-ms 2000
+"""
+import argparse
+import dataclasses
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+from stub_server import StubServer
+
+HEDGE_ENDPOINT = "geo/transcoord.json"
+BREAKER_CALLS = 20
+
+def percentiles(times: list[float]) -> dict:
+    times = sorted(times)
+    pick = lambda q: times[min(int(q * len(times)), len(times) - 1)]
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": times[-1]}
+
+def run_hedging(server: StubServer, requests: int, hedge: bool) -> dict:
+    import resilience
+    from client import kakao
+    policy = resilience.POLICIES[("kakao", HEDGE_ENDPOINT)]
+    if not hedge:
+        resilience.POLICIES[("kakao", HEDGE_ENDPOINT)] = dataclasses.replace(policy, hedge_after=None)
+    server.requests.clear()
+    times = []
+    try:
+        for i in range(requests): # 파라미터를 매번 바꿔서 scheduler의 같은 요청 합치기를 피함
+            start = time.perf_counter()
+            kakao().get(HEDGE_ENDPOINT, {"x": 309946 + i, "y": 552085, "input_coord": "KTM", "output_coord": "WGS84"})
+            times.append(time.perf_counter() - start)
+    finally:
+        resilience.POLICIES[("kakao", HEDGE_ENDPOINT)] = policy
+    return {**percentiles(times), "sent": sum(server.requests.values())}
+
+def run_breaker(server: StubServer, breaker: bool) -> list[float]:
+    import resilience
+    from client import opinet
+    cb = resilience.get_breaker("opinet")
+    failures = cb.failures
+    cb.reset()
+    if not breaker:
+        cb.failures = sys.maxsize
+    server.error_ratio = 1.0
+    times = []
+    try:
+        for _ in range(BREAKER_CALLS):
+            start = time.perf_counter()
+            try:
+                opinet().get("avgAllPrice.do", {})
+            except Exception:
+                pass
+            times.append(time.perf_counter() - start)
+    finally:
+        server.error_ratio = 0.0
+        cb.failures = failures
+        cb.reset()
+    return times
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--slow-ratio", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    server = StubServer(latency=args.latency_ms / 1000,
+                        slow_ratio=args.slow_ratio,
+                        slow_latency=args.slow_ms / 1000).start()
+    os.environ.update({
+        "OPINET_API_BASE_URL": f"{server.base_url}/opinet",
+        "KAKAO_API_BASE_URL": f"{server.base_url}/kakao",
+        "OPINET_API_KEY": "bench",
+        "KAKAO_REST_KEY": "bench",
+        "OPINET_RATE_LIMIT": "10000",
+        "OPINET_DAILY_QUOTA": "100000000",
+        "KAKAO_RATE_LIMIT": "10000",
+        "KAKAO_DAILY_QUOTA": "100000000"
+    })
+    failed = []
+
+    print(f"헤징 (kakao {HEDGE_ENDPOINT}, {args.requests}회, {args.slow_ratio:.0%} 요청 +{args.slow_ms:.0f}ms)")
+    print(f"{'':<10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'sent':>8}")
+    results = {}
+    for name, hedge in (("off", False), ("on", True)):
+        r = results[name] = run_hedging(server, args.requests, hedge)
+        print(f"{name:<10}{r['p50']*1000:>8.1f}ms{r['p95']*1000:>8.1f}ms{r['p99']*1000:>8.1f}ms"
+              f"{r['max']*1000:>8.1f}ms{r['sent']:>8}")
+    if results["on"]["p99"] >= results["off"]["p99"]:
+        failed.append("hedging")
+
+    print(f"\n서킷 브레이커 (opinet avgAllPrice.do, 모든 요청 503, {BREAKER_CALLS}회 연속 호출)")
+    for name, breaker in (("off", False), ("on", True)):
+        times = run_breaker(server, breaker)
+        tail = times[BREAKER_CALLS // 2:]
+        print(f"{name:<10}합계 {sum(times)*1000:>8.1f}ms  뒤쪽 절반 호출당 {statistics.median(tail)*1000:>7.2f}ms")
+        if breaker and statistics.median(tail) > args.latency_ms / 1000:
+            failed.append("circuit breaker")
+    server.stop()
+
+    if failed:
+        print(f"FAIL : {', '.join(failed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+API 조회결과 캐시 (TTL + LRU + stale-while-revalidate)
+데이터 종류별로 만료시간을 다르게 두고 만료된 값은 즉시 반환하면서 백그라운드에서 갱신
+"""
+import copy
+import functools
+import logging
+import threading
+import time
+import zoneinfo
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable
+
+import metrics
+from scheduler import background
+
+KOR = zoneinfo.ZoneInfo("Asia/Seoul")
+OPINET_DAILY_REFRESH_HOUR = 1 # 오피넷 평균가격 일일 갱신 시각 (한국시간)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+STATION_TTL = 10 * MINUTE # 주유소별 판매가격
+GEOCODE_TTL = 14 * DAY # 주소/좌표 변환
+REGION_TTL = 7 * DAY # 행정구역 코드
+
+logger = logging.getLogger(__name__)
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+def until_daily_refresh(hour: int = OPINET_DAILY_REFRESH_HOUR) -> float:
+    """다음 오피넷 일일 갱신 시각(epoch) 반환"""
+    now = datetime.now(tz=KOR)
+    refresh = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if refresh <= now:
+        refresh += timedelta(days=1)
+    return refresh.timestamp()
+
+DAILY_TTL = until_daily_refresh # 전국/시도 평균가격
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "refreshing")
+
+    def __init__(self, value, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.refreshing = False
+
+def ttl_cache(ttl: float | Callable[[], float],
+              max_entries: int = 128,
+              max_stale: float = DAY) -> Callable:
+    """
+    ttl : 만료까지 초(float) 또는 만료시각(epoch)을 반환하는 함수
+    max_entries : 최대 저장 개수, 초과시 가장 오래 사용하지 않은 값부터 삭제 (LRU)
+    max_stale : 만료 후에도 갱신하는 동안 반환할 수 있는 최대 시간(초), 넘으면 새로 조회할 때까지 대기
+    st.cache_data와 같이 예외는 캐시하지 않고 반환값은 복사본을 돌려줌
+    max_stale이 지난 값도 LRU에서 밀려나기 전이면 조회 실패(API 장애, 서킷 브레이커 차단 등)시 대신 반환
+    같은 키를 동시에 조회하면 API는 1번만 호출
+    조회 결과(hit, stale, miss, wait)는 함수명을 캐시 이름으로 metrics에 기록
+    """
+    def expires_at() -> float:
+        return ttl() if callable(ttl) else time.time() + ttl
+
+    def decorator(func: Callable) -> Callable:
+        entries: OrderedDict = OrderedDict()
+        inflight: dict = {}
+        lock = threading.Lock()
+
+        def store(key, value) -> None:
+            with lock:
+                entries[key] = _Entry(value, expires_at())
+                entries.move_to_end(key)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+
+        def refresh(key, args, kwargs) -> None:
+            try:
+                with background(): # 만료된 값은 이미 반환했으므로 화면 요청보다 나중에 호출
+                    store(key, func(*args, **kwargs))
+            except Exception:
+                logger.exception("%s 캐시 갱신 실패", func.__name__)
+                with lock:
+                    if key in entries:
+                        entries[key].refreshing = False
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.time()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None:
+                    entries.move_to_end(key)
+                    if now < entry.expires_at:
+                        metrics.record_cache(func.__name__, "hit")
+                        return copy.deepcopy(entry.value)
+                    if now < entry.expires_at + max_stale:
+                        if not entry.refreshing:
+                            entry.refreshing = True
+                            _refresh_pool.submit(refresh, key, args, kwargs)
+                        metrics.record_cache(func.__name__, "stale")
+                        return copy.deepcopy(entry.value)
+
+                future = inflight.get(key)
+                owner = future is None
+                if owner: # 같은 키를 동시에 조회하면 처음 요청만 실행하고 나머지는 결과를 기다림
+                    future = inflight[key] = Future()
+
+            if not owner:
+                metrics.record_cache(func.__name__, "wait")
+                return copy.deepcopy(future.result())
+            metrics.record_cache(func.__name__, "miss")
+            try:
+                value = func(*args, **kwargs)
+                store(key, value)
+                future.set_result(value)
+            except Exception as e:
+                if entry is None:
+                    future.set_exception(e)
+                    raise
+                logger.warning("%s 조회 실패, 만료된 값 반환 : %s", func.__name__, e)
+                metrics.record_cache(func.__name__, "fallback")
+                value = entry.value
+                future.set_result(value)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with lock:
+                    inflight.pop(key, None)
+            return copy.deepcopy(value)
+
+        def clear() -> None:
+            with lock:
+                entries.clear()
+
+        wrapper.clear = clear
+        return wrapper
+    return decorator
@@ -0,0 +1,126 @@
+"""
+오피넷 / 카카오맵 API 공용 HTTP 클라이언트
+프로세스당 하나의 requests.Session(커넥션 풀, keep-alive, gzip)을 공유하고
+API키는 .env에서 최초 1회만 읽음
+모든 요청은 scheduler(같은 요청 합치기, 호출 한도, 우선순위)를 거치고
+resilience의 엔드포인트별 정책(타임아웃, 재시도, 헤징, 서킷 브레이커)으로 호출
+"""
+import os
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+import metrics
+import resilience
+from scheduler import get_scheduler
+
+# 환경변수로 바꿀 수 있음 (bench/의 로컬 스텁 서버 등)
+OPINET_API_BASE_URL = os.getenv("OPINET_API_BASE_URL", "http://www.opinet.co.kr/api")
+KAKAO_API_BASE_URL = os.getenv("KAKAO_API_BASE_URL", "https://dapi.kakao.com/v2/local")
+
+POOL_CONNECTIONS = 4 # 커넥션 풀을 유지할 호스트 수
+POOL_MAXSIZE = 16 # 호스트당 최대 동시 연결 수
+
+_lock = threading.RLock()
+_session: requests.Session | None = None
+_clients: dict = {}
+
+def _load_key(name: str, error_msg: str) -> str:
+    project_root = Path(__file__).resolve().parent
+    env_path = project_root / ".env"
+    load_dotenv(dotenv_path=env_path, override=True)
+    key = os.getenv(name)
+    if not key:
+        raise RuntimeError(error_msg)
+    return key
+
+def get_session() -> requests.Session:
+    """프로세스 공용 Session 반환 (최초 호출시 생성)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({
+                    "Accept-Encoding": "gzip, deflate",
+                    "Connection": "keep-alive"
+                })
+                _session = session
+    return _session
+
+class ApiClient:
+    """API 호스트별 공통 요청 처리"""
+    base_url = ""
+    service = "" # 지표(metrics) 서비스명
+
+    def __init__(self, key: str):
+        self.key = key
+        self.session = get_session()
+
+    def _prepare(self, params: dict) -> tuple[dict, dict]:
+        return params, {}
+
+    def get(self, endpoint: str, params: dict) -> dict:
+        """
+        endpoint 호출 후 JSON 반환, 재시도 후에도 상태코드 200대가 아니면 HTTPError 발생
+        일일 호출 한도를 넘으면 scheduler.QuotaExceeded, 서킷 브레이커가 열려 있으면 resilience.CircuitOpen 발생
+        """
+        resilience.get_breaker(self.service).raise_if_open() # 차단 중이면 호출 한도 토큰을 쓰기 전에 실패
+        scheduler = get_scheduler()
+        key = (self.service, endpoint, tuple(sorted(params.items())))
+        return scheduler.call(self.service, key, lambda: resilience.call(
+            lambda timeout: self._request(endpoint, params, timeout),
+            self.service,
+            endpoint,
+            lambda block: scheduler.acquire(self.service, block)
+        ))
+
+    def _request(self, endpoint: str, params: dict, timeout: tuple[float, float]) -> dict:
+        params, headers = self._prepare(dict(params))
+        with metrics.timed(self.service, endpoint) as call:
+            response = self.session.get(f"{self.base_url}/{endpoint}",
+                                        params=params,
+                                        headers=headers,
+                                        timeout=timeout)
+            call["bytes"] = len(response.content)
+            response.raise_for_status()
+            return response.json()
+
+class OpinetClient(ApiClient):
+    base_url = OPINET_API_BASE_URL
+    service = "opinet"
+
+    def _prepare(self, params: dict) -> tuple[dict, dict]:
+        params = {"out": "json", "code": self.key, **params}
+        return params, {}
+
+class KakaoClient(ApiClient):
+    base_url = KAKAO_API_BASE_URL
+    service = "kakao"
+
+    def _prepare(self, params: dict) -> tuple[dict, dict]:
+        return params, {"Authorization": "KakaoAK " + self.key}
+
+def _get_client(cls, key_name: str, error_msg: str):
+    client = _clients.get(cls)
+    if client is None:
+        with _lock:
+            client = _clients.get(cls)
+            if client is None:
+                client = cls(_load_key(key_name, error_msg))
+                _clients[cls] = client
+    return client
+
+def opinet() -> OpinetClient:
+    """프로세스 공용 오피넷 클라이언트"""
+    return _get_client(OpinetClient, "OPINET_API_KEY", "OPINET API키를 찾을 수 없습니다.")
+
+def kakao() -> KakaoClient:
+    """프로세스 공용 카카오맵 REST 클라이언트"""
+    return _get_client(KakaoClient, "KAKAO_REST_KEY", "KAKAO REST API키를 찾을 수 없습니다.")
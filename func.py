@@ -1,33 +1,26 @@
-from pathlib import Path
 import requests
-from datetime import datetime
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from datetime import date, datetime
 from bidict import bidict
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-from dotenv import load_dotenv
 import os
 
-OPINET_API_BASE_URL = "http://www.opinet.co.kr/api"
-KAKAO_API_BASE_URL = "https://dapi.kakao.com/v2/local"
-
-def _require_opinet_key() -> str:
-    project_root = Path(__file__).resolve().parent
-    env_path = project_root / ".env"
-    load_dotenv(dotenv_path=env_path, override=True)
-    key = os.getenv("OPINET_API_KEY")
-    if not key:
-        raise RuntimeError("OPINET API키를 찾을 수 없습니다.")
-    return key
-
-def _require_kakao_rest_key() -> str:
-    project_root = Path(__file__).resolve().parent
-    env_path = project_root / ".env"
-    load_dotenv(dotenv_path=env_path, override=True)
-    key = os.getenv("KAKAO_REST_KEY")
-    if not key:
-        raise RuntimeError("KAKAO REST API키를 찾을 수 없습니다.")
-    return key
+import projection
+from cache import ttl_cache, DAY, DAILY_TTL, STATION_TTL, GEOCODE_TTL, REGION_TTL
+from client import opinet, kakao
+from geocode_store import get_geocode_store
+from scheduler import QuotaExceeded, background, get_scheduler
+from price_store import PriceStore
+
+if TYPE_CHECKING: # geopandas, scipy를 import하는 모듈은 처음 사용할 때 import
+    from station_index import StationIndex
 
 def get_opinet_oil_code() -> dict:
     oil_dict = {
@@ -39,6 +32,17 @@ def get_opinet_oil_code() -> dict:
     }
     return oil_dict
 
+OIL_CODE = bidict(get_opinet_oil_code()) # 유종코드 <=> 유종명
+OIL_ORDER = list(OIL_CODE.values()) # 화면 출력 순서 (휘발유, 경유, LPG, 고급휘발유, 등유)
+
+def _oil_category(codes: pd.Series) -> pd.Categorical:
+    """유종코드 컬럼을 유종명 범주형(출력 순서 고정)으로 변환"""
+    return pd.Categorical(codes.map(OIL_CODE), categories=OIL_ORDER, ordered=True)
+
+def _station_category(codes: pd.Series) -> pd.Series:
+    """상표코드 컬럼을 상표명 범주형으로 변환 (알 수 없는 코드는 그대로)"""
+    return codes.replace(get_opinet_station_code()).astype("category")
+
 def get_opinet_region_info() -> dict:
     region_dict = {
         "서울": "서울특별시",
@@ -61,7 +65,7 @@ def get_opinet_region_info() -> dict:
     }
     return region_dict
 
-@st.cache_data(show_spinner=False)
+@ttl_cache(ttl=REGION_TTL, max_entries=32)
 def get_opinet_region_code(area: str = None) -> dict:
     """
     지역 코드 반환
@@ -69,20 +73,16 @@ def get_opinet_region_code(area: str = None) -> dict:
     area 값으로 해당 시도의 시군구 행정구역 코드 반환
     ex) 0101: 종로구, 0102: 중구
     """
-    url = f"{OPINET_API_BASE_URL}/areaCode.do"
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
         "area": area
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        data = opinet().get("areaCode.do", params)
     except requests.exceptions.RequestException as e:
-        raise("get_opinet_region_code() ERROR: ", e)
+        raise RuntimeError(f"get_opinet_region_code() ERROR: {e}") from e
 
     region_code_dict = {}
-    oils = response.json()["RESULT"]["OIL"]
+    oils = data["RESULT"]["OIL"]
     if area is not None:
         return oils
 
@@ -90,6 +90,67 @@ def get_opinet_region_code(area: str = None) -> dict:
         region_code_dict[area["AREA_CD"]] = get_opinet_region_info().get(area["AREA_NM"])
     return region_code_dict
 
+REGION_INDEX_PATH = "./region_index.json"
+
+class RegionIndex:
+    """
+    오피넷 시도/시군구 지역코드 양방향 색인
+    sido : 시도코드 <=> 시도명 ex) 01 <=> 서울특별시
+    sigun : 시도코드별 시군구코드 <=> 시군구명 ex) 0101 <=> 종로구
+    """
+    def __init__(self, sido: dict, sigun: dict):
+        self.sido = bidict(sido)
+        self.sigun = {code: bidict(areas) for code, areas in sigun.items()}
+        self.sigun_names = {code: name for areas in sigun.values() for code, name in areas.items()}
+
+    @classmethod
+    def fetch(cls, max_workers: int = 8) -> "RegionIndex":
+        """전체 시도의 시군구 목록을 동시에 조회해서 색인 생성"""
+        sido = {code: name for code, name in get_opinet_region_code().items() if name}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(get_opinet_region_code, sido)
+            sigun = {code: {area["AREA_CD"]: area["AREA_NM"] for area in areas}
+                     for code, areas in zip(sido, results)}
+        return cls(sido, sigun)
+
+    @classmethod
+    def load(cls, path: str = REGION_INDEX_PATH, max_age: float = REGION_TTL) -> "RegionIndex":
+        """디스크에 저장된 색인을 불러오고 없거나 오래됐으면 새로 조회해서 저장"""
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["sido"], data["sigun"])
+
+        index = cls.fetch()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"sido": dict(index.sido),
+                       "sigun": {code: dict(areas) for code, areas in index.sigun.items()}},
+                      f, ensure_ascii=False)
+        return index
+
+    def sido_code(self, name: str) -> str | None:
+        return self.sido.inv.get(name)
+
+    def sido_name(self, code: str) -> str | None:
+        return self.sido.get(code)
+
+    def sigun_code(self, sido_code: str, name: str) -> str | None:
+        return self.sigun.get(sido_code, {}).inv.get(name)
+
+    def sigun_name(self, code: str) -> str | None:
+        return self.sigun_names.get(code)
+
+_region_index: RegionIndex | None = None
+_region_index_lock = threading.Lock()
+
+def get_region_index() -> RegionIndex:
+    """프로세스 공용 지역코드 색인 (최초 호출시 디스크 또는 API에서 불러옴)"""
+    global _region_index
+    with _region_index_lock:
+        if _region_index is None:
+            _region_index = RegionIndex.load()
+        return _region_index
+
 def get_opinet_station_code() -> dict:
     station_dict = {
         "SKE": "SK에너지",
@@ -106,138 +167,135 @@ def get_opinet_station_code() -> dict:
     }
     return station_dict
 
-@st.cache_data(show_spinner=False)
-def avg_price_all() -> list[dict]:
-    """전국 주유소 평균가격 조회"""
-    url = f"{OPINET_API_BASE_URL}/avgAllPrice.do"
-    params = {
-        "out": "json",
-        "code": _require_opinet_key()
-    }
+@ttl_cache(ttl=DAILY_TTL, max_entries=1)
+def avg_price_all() -> pd.DataFrame:
+    """전국 주유소 평균가격 조회 (유종 출력 순서로 정렬)"""
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # 상태코드 200대가 아니면 HTTPError 발생
+        data = opinet().get("avgAllPrice.do", {})  # 상태코드 200대가 아니면 HTTPError 발생
     except requests.exceptions.RequestException as e:
-        raise("avg_price_all() ERROR: ", e)
-
-    oils = response.json()["RESULT"]["OIL"]
-    for oil in oils:
-        oil["PRODNM"] = get_opinet_oil_code().get((oil["PRODCD"]))
-        oil["PRICE"] = float(oil["PRICE"])
-        oil["DIFF"] = float(oil["DIFF"])
-        oil["TRADE_DT"] = datetime.strptime(oil["TRADE_DT"], "%Y%m%d").date()
-    return oils
-
-@st.cache_data(show_spinner=False)
-def avg_price_sido() -> list[dict]:
-    """시도별 주유소 평균가격 조회"""
-    url = f"{OPINET_API_BASE_URL}/avgSidoPrice.do"
-    params = {
-        "out": "json",
-        "code": _require_opinet_key()
-    }
+        raise RuntimeError(f"avg_price_all() ERROR: {e}") from e
+
+    df = pd.DataFrame(data["RESULT"]["OIL"], columns=["TRADE_DT", "PRODCD", "PRODNM", "PRICE", "DIFF"])
+    df["PRODNM"] = _oil_category(df["PRODCD"])
+    df["PRICE"] = pd.to_numeric(df["PRICE"])
+    df["DIFF"] = pd.to_numeric(df["DIFF"])
+    df["TRADE_DT"] = pd.to_datetime(df["TRADE_DT"], format="%Y%m%d")
+    return df.sort_values("PRODNM").reset_index(drop=True)
+
+@ttl_cache(ttl=DAILY_TTL, max_entries=1)
+def avg_price_sido() -> pd.DataFrame:
+    """시도별 주유소 평균가격 조회 (시도 중심 좌표 lon, lat 포함, 없으면 0)"""
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # 상태코드 200대가 아니면 HTTPError 발생
+        data = opinet().get("avgSidoPrice.do", {})  # 상태코드 200대가 아니면 HTTPError 발생
     except requests.exceptions.RequestException as e:
-        raise("avg_price_sido() ERROR: ", e)
+        raise RuntimeError(f"avg_price_sido() ERROR: {e}") from e
 
     with open("./gisdata/ctprvn_centers.csv", "r", encoding="utf-8") as f:
-        df = pd.read_csv(f)
-
-    oils = response.json()["RESULT"]["OIL"]
-    for oil in oils:
-        oil["PRODCD"] = get_opinet_oil_code().get(oil["PRODCD"])
-        oil["PRICE"] = float(oil["PRICE"])
-        oil["DIFF"] = float(oil["DIFF"])
-        oil["SIDONM"] = get_opinet_region_info().get(oil["SIDONM"], oil["SIDONM"])
-        match = df[df["CTP_KOR_NM"] == str(oil["SIDONM"])] # 데이터프레임
-        if not match.empty:
-            oil["lon"] = float(match["lon"].values[0])
-            oil["lat"] = float(match["lat"].values[0])
-        else:
-            oil["lon"] = 0
-            oil["lat"] = 0
-    return oils
-
-@st.cache_data(show_spinner=False)
+        centers = pd.read_csv(f)
+
+    df = pd.DataFrame(data["RESULT"]["OIL"], columns=["SIDOCD", "SIDONM", "PRODCD", "PRICE", "DIFF"])
+    df["PRODCD"] = _oil_category(df["PRODCD"])
+    df["PRICE"] = pd.to_numeric(df["PRICE"])
+    df["DIFF"] = pd.to_numeric(df["DIFF"])
+    df["SIDONM"] = df["SIDONM"].map(lambda x: get_opinet_region_info().get(x, x))
+    centers = centers.drop_duplicates("CTP_KOR_NM").set_index("CTP_KOR_NM")
+    df["lon"] = df["SIDONM"].map(centers["lon"]).fillna(0).astype(float)
+    df["lat"] = df["SIDONM"].map(centers["lat"]).fillna(0).astype(float)
+    return df
+
+@ttl_cache(ttl=DAILY_TTL, max_entries=512)
 def avg_price_sigun(sido: str,
                     sigun: str,
-                    oil: str) -> list[dict]:
+                    oil: str) -> pd.DataFrame:
     """해당 시도의 시군구별 주유소 평균가격 조회"""
-    o = bidict(get_opinet_oil_code())
-    url = f"{OPINET_API_BASE_URL}/avgSigunPrice.do"
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
         "sido": sido,
         "sigun": sigun,
-        "prodcd": o.inv[oil]
+        "prodcd": OIL_CODE.inv[oil]
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        data = opinet().get("avgSigunPrice.do", params)
     except requests.exceptions.RequestException as e:
-        raise("avg_price_sigun() ERROR: ", e)
+        raise RuntimeError(f"avg_price_sigun() ERROR: {e}") from e
 
-    oils = response.json()["RESULT"]["OIL"]
-    return oils
+    df = pd.DataFrame(data["RESULT"]["OIL"], columns=["SIGUNCD", "SIGUNNM", "PRICE", "DIFF"])
+    df["PRICE"] = pd.to_numeric(df["PRICE"])
+    df["DIFF"] = pd.to_numeric(df["DIFF"])
+    return df
 
-@st.cache_data(show_spinner=False)
+@ttl_cache(ttl=DAILY_TTL, max_entries=256)
 def avg_price_sido_period_search(region: str,
                                  oil: str,
                                  day: datetime) -> list[dict]:
     """기준일(작일부터 조회가능)로부터 이전 7일간 지역별 주유소 평균가격 조회"""
-    r = bidict(get_opinet_region_code())
-    o = bidict(get_opinet_oil_code())
-    url = f"{OPINET_API_BASE_URL}/dateAreaAvgRecentPrice.do"
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
-        "area": r.inv[region],
-        "prodcd": o.inv[oil],
+        "area": get_region_index().sido_code(region),
+        "prodcd": OIL_CODE.inv[oil],
         "date": day
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # 상태코드 200대가 아니면 HTTPError 발생
+        data = opinet().get("dateAreaAvgRecentPrice.do", params)  # 상태코드 200대가 아니면 HTTPError 발생
     except requests.exceptions.RequestException as e:
-        raise("avg_price_sido_period_search() ERROR: ", e)
+        raise RuntimeError(f"avg_price_sido_period_search() ERROR: {e}") from e
 
-    oils = response.json()["RESULT"]["OIL"]
+    oils = data["RESULT"]["OIL"]
     for area in oils:
         area["AREA_NM"] = get_opinet_region_info().get(area["AREA_NM"])
         area["PRODCD"] = get_opinet_oil_code().get(area["PRODCD"])
     return oils
 
-@st.cache_data(show_spinner=False)
+@ttl_cache(ttl=DAILY_TTL, max_entries=64)
 def avg_price_all_period_search(oil: str, day: datetime) -> list[dict]:
     """기준일(작일부터 조회가능)로부터 이전 7일간 전국 주유소 평균가격 조회"""
-    o = bidict(get_opinet_oil_code())
-    url = f"{OPINET_API_BASE_URL}/dateAvgRecentPrice.do"
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
-        "prodcd": o.inv[oil],
+        "prodcd": OIL_CODE.inv[oil],
         "date": day
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()  # 상태코드 200대가 아니면 HTTPError 발생
+        data = opinet().get("dateAvgRecentPrice.do", params)  # 상태코드 200대가 아니면 HTTPError 발생
     except requests.exceptions.RequestException as e:
-        raise("avg_price_all_period_search() ERROR: ", e)
+        raise RuntimeError(f"avg_price_all_period_search() ERROR: {e}") from e
 
-    oils = response.json()["RESULT"]["OIL"]
+    oils = data["RESULT"]["OIL"]
     for area in oils:
         area["AREA_NM"] = "전국"
         area["PRODCD"] = get_opinet_oil_code().get(area["PRODCD"])
     return oils
 
-@st.cache_data(show_spinner=False)
+PERIOD_SEARCH_WORKERS = 4 # 기간 조회시 동시에 호출할 최대 API 요청 수
+
+def avg_price_period_search(regions: list[str],
+                            oil: str,
+                            start_date: date,
+                            end_date: date,
+                            max_workers: int = PERIOD_SEARCH_WORKERS) -> pd.DataFrame:
+    """
+    여러 지역의 기간별 평균가격 조회
+    로컬 저장소(price_store)에 없는 날짜만 7일 단위로 나눠 (지역 x 기간) 요청을 스레드풀에서 동시에 호출
+    저장 후 저장소에서 조회기간을 날짜, 지역순으로 정렬해서 반환
+    """
+    store = PriceStore()
+    jobs = [(region, day) for region in regions
+            for day in store.missing_windows(region, oil, start_date, end_date)]
+
+    def fetch(region: str, day: date) -> list[dict]:
+        if region == "전국":
+            return avg_price_all_period_search(oil, day)
+        return avg_price_sido_period_search(region, oil, day)
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch, region, day) for region, day in jobs]
+            for (region, day), future in zip(jobs, futures):
+                store.save(region, oil, day, future.result())
+
+    df = store.query(regions, oil, start_date, end_date)
+    df["DATE"] = pd.to_datetime(df["DATE"], format="%Y%m%d").dt.strftime("%Y-%m-%d") # 출력 포맷 변환
+    return df
+
+@ttl_cache(ttl=GEOCODE_TTL, max_entries=4096)
 def katec_to_wgs84(x: float, y: float) -> tuple[float, float]:
     """(카카오맵 API) 좌표계 변환 KATEC => WGS84"""
-    url = f"{KAKAO_API_BASE_URL}/geo/transcoord.json"
-    headers = {"Authorization": "KakaoAK " + _require_kakao_rest_key()}
     params = {
         "x": x,
         "y": y,
@@ -245,22 +303,19 @@ def katec_to_wgs84(x: float, y: float) -> tuple[float, float]:
         "output_coord": "WGS84"
     }
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        data = kakao().get("geo/transcoord.json", params)
     except requests.exceptions.RequestException as e:
-        raise("katec_to_wgs84() ERROR: ", e)
+        raise RuntimeError(f"katec_to_wgs84() ERROR: {e}") from e
 
-    gis = response.json().get("documents", [])
+    gis = data.get("documents", [])
     if gis:
         return gis[0]["x"], gis[0]["y"]
     else:
         return None
 
-@st.cache_data(show_spinner=False)
+@ttl_cache(ttl=GEOCODE_TTL, max_entries=4096)
 def wgs84_to_katec(x: float, y: float) -> tuple[float, float]:
     """(카카오맵 API) 좌표계 변환 WGS84 => KATEC"""
-    url = f"{KAKAO_API_BASE_URL}/geo/transcoord.json"
-    headers = {"Authorization": "KakaoAK " + _require_kakao_rest_key()}
     params = {
         "x": x,
         "y": y,
@@ -268,128 +323,278 @@ def wgs84_to_katec(x: float, y: float) -> tuple[float, float]:
         "output_coord": "KTM"
     }
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        data = kakao().get("geo/transcoord.json", params)
     except requests.exceptions.RequestException as e:
-        raise("wgs84_to_katec() ERROR: ", e)
+        raise RuntimeError(f"wgs84_to_katec() ERROR: {e}") from e
 
-    gis = response.json().get("documents", [])
+    gis = data.get("documents", [])
     if gis:
         return gis[0]["x"], gis[0]["y"]
     else:
         return None
 
-@st.cache_data(show_spinner=False)
-def around_station_search(lon: float,
-                          lat: float,
-                          radius: int,
-                          oil_type: str,
-                          sort: int) -> tuple[list[dict], bool]:
+def katec_to_wgs84_batch(x, y) -> tuple[list[float], list[float]]:
+    """(로컬) 좌표계 일괄 변환 KATEC => WGS84, 카카오 KTM 변환과 projection.TOLERANCE_M 이내 오차"""
+    lon, lat = projection.katec_to_wgs84(x, y)
+    return lon.tolist(), lat.tolist()
+
+def wgs84_to_katec_batch(x, y) -> tuple[list[float], list[float]]:
+    """(로컬) 좌표계 일괄 변환 WGS84 => KATEC, 카카오 KTM 변환과 projection.TOLERANCE_M 이내 오차"""
+    k_x, k_y = projection.wgs84_to_katec(x, y)
+    return k_x.tolist(), k_y.tolist()
+
+def _around_all(lon: float, lat: float, radius: int, oil_type: str, sort: int) -> list[dict]:
     """
-    위치 반경내 주유소 검색
-    카카오맵 API로 좌표게 변환 WGS84 => KATEC
-    KATEC으로 변환된 좌표계로 오피넷 API '내 주변 주유소 검색'
-    반환된 경도, 위도 좌표값 (KATEC)
-    카카오맵 API로 좌표계 변환 KATEC => WGS84
-    반경내 검색된 주유소가 있으면 데이터와 True 반환하고 없으면 False 반환
+    오피넷 API '내 주변 주유소 검색'
+    로컬(pyproj)에서 좌표계 변환 WGS84 => KATEC 후 조회하고
+    반환된 KATEC 좌표값을 로컬(pyproj)에서 검색결과 전체를 한번에 WGS84로 변환
     """
-    o = bidict(get_opinet_oil_code())
-    k_lon, k_lat = wgs84_to_katec(lon, lat)
-    url = f"{OPINET_API_BASE_URL}/aroundAll.do"
+    (k_lon,), (k_lat,) = wgs84_to_katec_batch([lon], [lat])
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
         "x": k_lon,
         "y": k_lat,
         "radius": radius,
-        "prodcd": o.inv[oil_type],
+        "prodcd": OIL_CODE.inv[oil_type],
         "sort": sort
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        data = opinet().get("aroundAll.do", params)
     except requests.exceptions.RequestException as e:
-        raise ("around_station_search() ERROR: ", e)
+        raise RuntimeError(f"around_station_search() ERROR: {e}") from e
 
-    oils = response.json()["RESULT"]["OIL"]
+    oils = data["RESULT"]["OIL"]
     if oils:
-        for oil in oils:
-            g_lon, g_lat = katec_to_wgs84(oil["GIS_X_COOR"], oil["GIS_Y_COOR"])
-            oil["LON_WGS84"] = float(g_lon)
-            oil["LAT_WGS84"] = float(g_lat)
+        g_lon, g_lat = katec_to_wgs84_batch([float(oil["GIS_X_COOR"]) for oil in oils],
+                                            [float(oil["GIS_Y_COOR"]) for oil in oils])
+        for oil, x, y in zip(oils, g_lon, g_lat):
+            oil["LON_WGS84"] = x
+            oil["LAT_WGS84"] = y
             oil["POLL_DIV_CD"] = get_opinet_station_code().get(oil["POLL_DIV_CD"], oil["POLL_DIV_CD"])
             oil["PRODCD"] = oil_type
-        return oils, True
-    else:
-        return oils, False
+    return oils
+
+_station_index: "StationIndex | None" = None
+_station_index_lock = threading.Lock()
+
+def get_station_index() -> "StationIndex":
+    """프로세스 공용 주유소 공간 색인"""
+    global _station_index
+    with _station_index_lock:
+        if _station_index is None:
+            from station_index import StationIndex
+            _station_index = StationIndex()
+        return _station_index
+
+STATION_COLUMNS = ["UNI_ID", "POLL_DIV_CD", "OS_NM", "PRICE", "DISTANCE",
+                   "GIS_X_COOR", "GIS_Y_COOR", "LON_WGS84", "LAT_WGS84", "PRODCD"]
+
+@ttl_cache(ttl=STATION_TTL, max_entries=256)
+def around_station_search(lon: float,
+                          lat: float,
+                          radius: int,
+                          oil_type: str,
+                          sort: int) -> tuple[pd.DataFrame, bool]:
+    """
+    위치 반경내 주유소 검색
+    최근에 조회된 영역이면 로컬 주유소 색인(station_index)에서 검색하고
+    아니면 오피넷 API '내 주변 주유소 검색' 후 결과를 색인에 추가
+    가격, 거리는 숫자형 / 상표, 유종은 범주형 컬럼으로 반환
+    반경내 검색된 주유소가 있으면 데이터와 True 반환하고 없으면 False 반환
+    """
+    lon, lat = float(lon), float(lat)
+    index = get_station_index()
+    oils = index.query(lon, lat, radius, oil_type, sort)
+    if oils is None:
+        oils = _around_all(lon, lat, radius, oil_type, sort)
+        index.add(lon, lat, radius, oil_type, oils)
+
+    df = pd.DataFrame(oils, columns=STATION_COLUMNS)
+    for col in ["PRICE", "DISTANCE", "GIS_X_COOR", "GIS_Y_COOR", "LON_WGS84", "LAT_WGS84"]:
+        df[col] = pd.to_numeric(df[col])
+    df["POLL_DIV_CD"] = df["POLL_DIV_CD"].astype("category")
+    df["PRODCD"] = pd.Categorical(df["PRODCD"], categories=OIL_ORDER)
+    return df, not df.empty
+
+HARVEST_RADIUS = 5000 # aroundAll 최대 반경
+HARVEST_SPACING = 6000 # 수집 격자 간격(m), 반경 5km 원들이 국토를 빈틈없이 덮는 간격
+HARVEST_PRODUCTS = ["휘발유", "경유"]
+HARVEST_INTERVAL = 5.0 # 수집 API 최소 호출 간격(초)
+HARVEST_TTL = 3 * DAY # 수집한 영역을 다시 조회할 주기 (화면 검색에 쓰는 가격의 최대 나이 STATION_TTL과 별개)
+HARVEST_LEAVE = 300 # 오피넷 백그라운드 일일 한도 중 캐시 갱신(ttl_cache)용으로 남겨둘 호출 수
+KOREA_BBOX = (124.5, 33.0, 131.0, 38.7) # 경도, 위도 최소/최대
+
+def harvest_grid(spacing: float = HARVEST_SPACING) -> list[tuple[float, float]]:
+    """국토(시군구 경계 안)를 덮는 육각 격자 좌표, 시군구 경계가 없으면 FileNotFoundError"""
+    min_lon, min_lat, max_lon, max_lat = KOREA_BBOX
+    d_lat = spacing * 0.866 / 111_320
+    lats = np.arange(min_lat, max_lat, d_lat)
+    lons, grid_lats = [], []
+    for row, lat in enumerate(lats):
+        d_lon = spacing / (111_320 * np.cos(np.radians(lat)))
+        row_lons = np.arange(min_lon + (d_lon / 2 if row % 2 else 0), max_lon, d_lon)
+        lons.extend(row_lons)
+        grid_lats.extend([lat] * len(row_lons))
+    import reverse_geocoder
+    land = reverse_geocoder.is_land(lons, grid_lats)
+    return [(float(x), float(y)) for x, y, keep in zip(lons, grid_lats, land) if keep]
+
+def harvest_interval(min_interval: float = HARVEST_INTERVAL) -> float:
+    """
+    다음 수집 호출까지 대기시간(초)
+    오늘 남은 오피넷 백그라운드 한도(HARVEST_LEAVE 제외)를 한도 초기화 시각까지 고르게 나눠 씀
+    남은 한도가 없으면 초기화 시각까지 대기
+    """
+    spare, until_reset = get_scheduler().background_budget("opinet")
+    spare -= HARVEST_LEAVE
+    if spare <= 0:
+        return until_reset + 1
+    return max(min_interval, until_reset / spare)
+
+def _harvest_target(index: "StationIndex",
+                    grid: list[tuple[float, float]],
+                    products: list[str],
+                    expand: bool) -> tuple[float, float, str] | None:
+    """expand면 아직 조회하지 않은 격자를, 아니면 HARVEST_TTL이 지난 영역(오래된 순)을 먼저 고름 (없으면 다른 쪽)"""
+    def stale():
+        return [(lon, lat, oil) for lon, lat, radius, oil in index.stale_circles(HARVEST_TTL)
+                if radius == HARVEST_RADIUS and oil in products]
+
+    def new():
+        return [(lon, lat, oil) for oil in products for lon, lat in grid
+                if (lon, lat, float(HARVEST_RADIUS), oil) not in index.coverage]
+
+    for targets in ((new, stale) if expand else (stale, new)):
+        found = targets()
+        if found:
+            return found[0]
+    return None
+
+def run_harvester(stop: threading.Event,
+                  products: list[str] = HARVEST_PRODUCTS,
+                  interval: float = HARVEST_INTERVAL) -> None:
+    """
+    백그라운드 주유소 수집
+    아직 조회하지 않은 격자 채우기와 HARVEST_TTL이 지난 영역 다시 조회하기를 번갈아 실행
+    호출 간격은 남은 백그라운드 한도로 정하고(harvest_interval) 화면 요청보다 나중에 처리 (scheduler.background)
+    """
+    log = logging.getLogger(__name__)
+    try:
+        grid = harvest_grid()
+    except FileNotFoundError:
+        # 육지 경계 없이 bbox 전체(바다, 북한 포함)를 수집하면 일일 호출 한도를 모두 써버림
+        log.error("시군구 경계 파일이 없어서 주유소 수집을 시작하지 않음", exc_info=True)
+        return
+    index = get_station_index()
+    expand = True
+    while not stop.wait(harvest_interval(interval)):
+        target = _harvest_target(index, grid, products, expand)
+        expand = not expand
+        if target is None:
+            continue
+        lon, lat, oil = target
+        try:
+            with background():
+                index.add(lon, lat, HARVEST_RADIUS, oil, _around_all(lon, lat, HARVEST_RADIUS, oil, 2))
+        except QuotaExceeded as e:
+            log.warning("주유소 수집 보류 : %s", e)
+        except Exception:
+            log.exception("주유소 수집 실패 (%s, %s, %s)", lon, lat, oil)
+
+def start_harvester() -> threading.Event:
+    """수집 스레드 시작, 반환된 Event를 set하면 종료"""
+    stop = threading.Event()
+    threading.Thread(target=run_harvester, args=(stop,), name="station-harvester", daemon=True).start()
+    return stop
 
-@st.cache_data(show_spinner=False)
 def address_to_gis(addr: str) -> tuple[float, float]:
-    """(카카오맵 API) 주소로 WGS84 좌표계 반환 잘못된 주소로 인해 좌표값이 없을 경우 None 반환"""
-    url = f"{KAKAO_API_BASE_URL}/search/address.json"
-    headers = {"Authorization": "KakaoAK " + _require_kakao_rest_key()}
+    """
+    (카카오맵 API) 주소로 WGS84 좌표계 반환 잘못된 주소로 인해 좌표값이 없을 경우 None 반환
+    결과는 정규화한 주소를 키로 geocode_store(SQLite)에 저장해서 모든 프로세스가 공유
+    API 조회에 실패하면 만료된 좌표라도 저장돼 있으면 반환
+    """
+    store = get_geocode_store()
+    found, gis = store.get(addr)
+    if found:
+        return gis
+
     params = {
-        "query": addr
+        "query": addr.strip()
     }
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        raise("addr_to_gis() ERROR: ", e)
-
-    gis = response.json().get("documents", [])
-    if gis:
-        return gis[0]["x"], gis[0]["y"]
-    else:
-        return None
-
-@st.cache_data(show_spinner=False)
+        data = kakao().get("search/address.json", params)
+    except Exception as e:
+        stale = store.get_stale(addr)
+        if stale is not None:
+            logging.getLogger(__name__).warning("addr_to_gis() 조회 실패, 저장된 좌표 반환 : %s", e)
+            return stale
+        if isinstance(e, requests.exceptions.RequestException):
+            raise RuntimeError(f"addr_to_gis() ERROR: {e}") from e
+        raise
+
+    gis = data.get("documents", [])
+    gis = (gis[0]["x"], gis[0]["y"]) if gis else None
+    store.put(addr, gis)
+    return gis
+
+@ttl_cache(ttl=GEOCODE_TTL, max_entries=4096)
 def xy_to_district(x: float, y: float) -> list[dict]:
     """(카카오맵 API) 경도, 위도값으로 행정구역 반환"""
-    url = f"{KAKAO_API_BASE_URL}/geo/coord2regioncode.json"
-    headers = {"Authorization": "KakaoAK " + _require_kakao_rest_key()}
     params = {
         "x": x,
         "y": y
     }
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        data = kakao().get("geo/coord2regioncode.json", params)
     except requests.exceptions.RequestException as e:
-        raise("xy_to_district() ERROR: ", e)
+        raise RuntimeError(f"xy_to_district() ERROR: {e}") from e
 
-    district = response.json().get("documents", [])
+    district = data.get("documents", [])
     for d in district:
         if d["region_1depth_name"] == "강원특별자치도":
             d["region_1depth_name"] = "강원도"
     return district
 
-@st.cache_data(show_spinner=False)
-def station_info_search(station_id: str) -> list[dict]:
+@ttl_cache(ttl=STATION_TTL, max_entries=1024)
+def station_info_search(station_id: str) -> pd.DataFrame:
     """
     (AI가 사용할 함수) 주유소 ID로 주유소 상세 검색
     주소, 기름가격, 전화번호, 세차장, 편의점, 경정비 시설 유무 등등...
+    유종별 가격(OIL_PRICE)을 펼쳐서 주유소 x 유종별 1행으로 반환
     """
-    print("##### AI 함수 호출 #####")
-    url = f"{OPINET_API_BASE_URL}/detailById.do"
     params = {
-        "out": "json",
-        "code": _require_opinet_key(),
         "id": station_id
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        data = opinet().get("detailById.do", params)
     except requests.exceptions.RequestException as e:
-        raise("station_info_search() ERROR: ", e)
-
-    oils = response.json()["RESULT"]["OIL"]
-    for station in oils:
-        station["POLL_DIV_CO"] = get_opinet_station_code().get(station["POLL_DIV_CO"], station["POLL_DIV_CO"])
-        station["GPOLL_DIV_CO"] = get_opinet_station_code().get(station["GPOLL_DIV_CO"], station["GPOLL_DIV_CO"])
-        for oil in station["OIL_PRICE"]:
-            oil["PRODCD"] = get_opinet_oil_code().get(oil["PRODCD"], oil["PRODCD"])
-    return oils
+        raise RuntimeError(f"station_info_search() ERROR: {e}") from e
+
+    oils = data["RESULT"]["OIL"]
+    if not oils:
+        return pd.DataFrame()
+    meta = [key for key in oils[0] if key != "OIL_PRICE"]
+    df = pd.json_normalize(oils, record_path="OIL_PRICE", meta=meta) # 주유소 x 유종별 1행
+    df["POLL_DIV_CO"] = _station_category(df["POLL_DIV_CO"])
+    df["GPOLL_DIV_CO"] = _station_category(df["GPOLL_DIV_CO"])
+    df["PRODCD"] = _oil_category(df["PRODCD"])
+    df["PRICE"] = pd.to_numeric(df["PRICE"])
+    df["TRADE_DT"] = pd.to_datetime(df["TRADE_DT"], format="%Y%m%d")
+    return df
+
+PREFETCH_WORKERS = 4
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="station-prefetch")
+
+def prefetch_station_info(station_ids) -> list[Future]:
+    """
+    주유소 상세정보를 백그라운드에서 동시에 미리 조회
+    결과는 station_info_search() 캐시에 저장되어 TTL 동안 모든 세션이 공유
+    백그라운드 우선순위로 호출하고 같은 주유소를 화면에서 조회하면 화면 요청 우선순위로 올라감
+    """
+    return [_prefetch_pool.submit(_prefetch, station_id) for station_id in dict.fromkeys(station_ids)]
+
+def _prefetch(station_id: str) -> pd.DataFrame:
+    with background():
+        return station_info_search(station_id)
 
 # tools = [
 #     {"type": "function",
@@ -0,0 +1,180 @@
+"""
+주소 => 좌표 변환 결과 로컬 저장소 (SQLite, 모든 프로세스가 공유하고 재배포 후에도 유지)
+정규화한 주소(normalize_address)를 키로 저장해서 표기만 다른 주소는 카카오맵 API를 다시 호출하지 않음
+좌표가 없는 주소도 NEGATIVE_TTL 동안 저장 (잘못 입력한 주소를 반복 조회하지 않기 위함)
+자주 조회된 주소는 CSV로 내보내고 새 환경에서 가져와서 미리 채울 수 있음
+
+실행 : python geocode_store.py export popular.csv --limit 1000
+      python geocode_store.py import popular.csv     # address,x,y 열 (x,y가 비어 있으면 API로 조회)
+"""
+import argparse
+import csv
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import closing
+from typing import Iterable
+
+import metrics
+from cache import DAY, HOUR
+
+GEOCODE_DB_PATH = "./geocode_cache.db"
+POSITIVE_TTL = 90 * DAY # 좌표가 있는 주소
+NEGATIVE_TTL = HOUR # 좌표가 없는 주소
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    key TEXT PRIMARY KEY,
+    address TEXT NOT NULL,
+    x TEXT,
+    y TEXT,
+    fetched_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# 시도명 => 약칭 (광주시는 경기도 광주시와 겹쳐서 제외)
+_SIDO = { # 광주시는 경기도 광주시와 겹쳐서 약칭으로 바꾸지 않음
+    "서울특별시": "서울", "서울시": "서울",
+    "부산광역시": "부산", "대구광역시": "대구", "인천광역시": "인천", "광주광역시": "광주",
+    "대전광역시": "대전", "울산광역시": "울산", "세종특별자치시": "세종",
+    "부산시": "부산", "대구시": "대구", "인천시": "인천", "대전시": "대전", "울산시": "울산", "세종시": "세종",
+    "경기도": "경기", "강원특별자치도": "강원", "강원도": "강원",
+    "충청북도": "충북", "충청남도": "충남", "전북특별자치도": "전북", "전라북도": "전북",
+    "전라남도": "전남", "경상북도": "경북", "경상남도": "경남",
+    "제주특별자치도": "제주", "제주도": "제주"
+}
+_SIDO_RE = re.compile(r"^(" + "|".join(sorted(_SIDO, key=len, reverse=True)) + r")(?=\s|$)")
+
+def normalize_address(addr: str) -> str:
+    """
+    저장소 키용 주소 정규화
+    시도명은 약칭으로 (서울특별시 => 서울), 공백은 모두 제거 (세종대로 110 => 세종대로110)
+    """
+    addr = unicodedata.normalize("NFC", addr).strip()
+    addr = _SIDO_RE.sub(lambda m: _SIDO[m.group(1)], addr)
+    return re.sub(r"\s+", "", addr)
+
+class GeocodeStore:
+    """
+    geocode : 정규화한 주소별 좌표 (x, y가 NULL이면 좌표 없음)
+    address는 처음 조회한 주소 원문, hits는 저장소에서 찾은 횟수
+    """
+    def __init__(self,
+                 path: str = GEOCODE_DB_PATH,
+                 ttl: float = POSITIVE_TTL,
+                 negative_ttl: float = NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL") # 캐시라서 전원 장애시 마지막 몇 건을 잃어도 됨 (커밋마다 fsync 생략)
+        return conn
+
+    def get(self, addr: str) -> tuple[bool, tuple[str, str] | None]:
+        """(저장 여부, 좌표) 반환, 만료된 값은 저장되지 않은 것으로 봄 (metrics에 geocode_store 캐시로 기록)"""
+        key = normalize_address(addr)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT x, y, fetched_at FROM geocode WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[2] >= (self.ttl if row[0] is not None else self.negative_ttl):
+                metrics.record_cache("geocode_store", "miss")
+                return False, None
+            conn.execute("UPDATE geocode SET hits = hits + 1 WHERE key = ?", (key,))
+        metrics.record_cache("geocode_store", "hit")
+        x, y, _ = row
+        return True, ((x, y) if x is not None else None)
+
+    def get_stale(self, addr: str) -> tuple[str, str] | None:
+        """만료와 관계없이 저장된 좌표 (API 조회 실패시 대신 사용)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT x, y FROM geocode WHERE key = ? AND x IS NOT NULL",
+                               (normalize_address(addr),)).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, addr: str, gis: tuple[str, str] | None) -> None:
+        self.bulk_put([(addr, *(gis or (None, None)))])
+
+    def bulk_put(self, rows: Iterable[tuple[str, str | None, str | None]]) -> int:
+        """(주소, x, y) 여러건 저장 (x, y가 None이면 좌표 없음), 같은 키는 덮어쓰고 hits는 유지"""
+        now = time.time()
+        rows = [(normalize_address(addr), addr.strip(), x, y, now) for addr, x, y in rows]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO geocode (key, address, x, y, fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET x = excluded.x, y = excluded.y, fetched_at = excluded.fetched_at
+                """,
+                rows
+            )
+        return len(rows)
+
+    def popular(self, limit: int = 1000) -> list[dict]:
+        """좌표가 있는 주소를 저장소에서 찾은 횟수 순으로 반환 (address, x, y, hits)"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT address, x, y, hits FROM geocode WHERE x IS NOT NULL ORDER BY hits DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [{"address": a, "x": x, "y": y, "hits": h} for a, x, y, h in rows]
+
+_store: GeocodeStore | None = None
+_lock = threading.Lock()
+
+def get_geocode_store() -> GeocodeStore:
+    """프로세스 공용 주소 좌표 저장소"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = GeocodeStore()
+        return _store
+
+def export_csv(path: str, limit: int = 1000) -> int:
+    rows = get_geocode_store().popular(limit)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["address", "x", "y", "hits"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+def import_csv(path: str) -> int:
+    """
+    address, x, y 열의 CSV 가져오기
+    좌표가 있는 행은 그대로 저장하고 없는 행은 func.address_to_gis()로 조회 (백그라운드 우선순위)
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = [r for r in csv.DictReader(f) if r.get("address", "").strip()]
+    known = [(r["address"], r["x"], r["y"]) for r in rows if r.get("x") and r.get("y")]
+    count = get_geocode_store().bulk_put(known)
+
+    unknown = [r["address"] for r in rows if not (r.get("x") and r.get("y"))]
+    if unknown:
+        import func
+        from scheduler import background
+        with background():
+            for addr in unknown:
+                func.address_to_gis(addr)
+                count += 1
+    return count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"내보낸 주소 : {export_csv(args.path, args.limit)}건")
+    else:
+        print(f"가져온 주소 : {import_csv(args.path)}건")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+reverse_geocoder용 시군구 경계(TL_SCCO_SIG.json) 생성
+공식 시군구 경계 대신 korean-geocoding 패키지(MIT)의 읍면동/리 중심점으로 시도별 보로노이 영역을 만들고
+시도 경계(TL_SCCO_CTPRVN.json, 파일은 바꾸지 않고 읽을 때 make_valid)로 잘라서 시군구별로 합침
+시군구끼리 맞닿은 변은 근사치라서 reverse_geocoder는 그 변 근처(SIGUNGU_EDGE_MARGIN_M)에서는 시군구를 정하지 않음
+시군구명은 카카오 region_2depth_name 형식 (ex. 종로구, 수원시 팔달구, 세종특별자치시)
+속성 : SIG_KOR_NM(시군구명), CTPRVN_CD(시도코드)
+
+--evaluate : 중심점 일부(holdout)를 빼고 만든 경계로 뺀 점의 시군구를 찾아서
+             틀린 점이 실제 시군구 영역에서 얼마나 떨어져 있는지(m) 출력 (SIGUNGU_EDGE_MARGIN_M 근거)
+
+실행 : pip install korean-geocoding --no-deps
+      python gisdata/build_boundaries.py [--evaluate]
+"""
+import argparse
+import os
+import pickle
+from importlib.resources import files
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+GISDATA_DIR = os.path.dirname(os.path.abspath(__file__))
+SIDO_PATH = os.path.join(GISDATA_DIR, "TL_SCCO_CTPRVN.json")
+SIGUNGU_PATH = os.path.join(GISDATA_DIR, "TL_SCCO_SIG.json")
+PRECISION = 1e-5 # 좌표 반올림 (도, 약 1m)
+M_PER_DEG = 111_320
+
+def _points(section) -> list[tuple[float, float]]:
+    """section과 모든 하위 지역의 중심점 (경도, 위도)"""
+    points = [(section.coordinates[1], section.coordinates[0])] if section.coordinates else []
+    for child in section.children.values():
+        points += _points(child)
+    return points
+
+def _is_gu(name: str, section) -> bool:
+    return name.endswith("구") and bool(section.children)
+
+def load_sigungu_points() -> dict[str, dict[str, list]]:
+    """시도명별 {시군구명: 중심점 목록} (시 아래 구가 있으면 "시 구"로 나눔)"""
+    from korean_geocoding.common import SIDO_DICT
+    data_dir = files("korean_geocoding") / "data"
+    result = {}
+    for sido_name, filename in SIDO_DICT.items():
+        with (data_dir / f"{filename}.dat").open("rb") as f:
+            root = pickle.load(f)
+        if sido_name == "세종특별자치시": # 시군구 없이 읍면동
+            result[sido_name] = {sido_name: _points(root)}
+            continue
+        sigungu = {}
+        for name, section in root.children.items():
+            gus = {gu: s for gu, s in section.children.items() if _is_gu(gu, s)}
+            if name.endswith("시") and gus:
+                for gu, s in gus.items():
+                    sigungu[f"{name} {gu}"] = _points(s)
+            else:
+                sigungu[name] = _points(section)
+        result[sido_name] = {name: points for name, points in sigungu.items() if points}
+    return result
+
+def load_sido() -> gpd.GeoDataFrame:
+    sido = gpd.read_file(SIDO_PATH)
+    sido["geometry"] = shapely.make_valid(sido.geometry.values)
+    return sido
+
+def _seeds(sigungu: dict[str, list]) -> tuple[np.ndarray, np.ndarray]:
+    """(중심점 좌표 배열, 시군구명 배열), 같은 좌표는 1번만"""
+    names = np.array([name for name, points in sigungu.items() for _ in points], dtype=object)
+    coords = np.array([p for points in sigungu.values() for p in points])
+    coords, unique = np.unique(coords, axis=0, return_index=True)
+    return coords, names[unique]
+
+def _regions(area, coords: np.ndarray, names: np.ndarray) -> dict:
+    """중심점별 보로노이 영역을 시군구별로 합치고 area로 자름"""
+    seeds = shapely.points(coords)
+    cells = shapely.voronoi_polygons(shapely.multipoints(seeds), extend_to=area).geoms
+    # voronoi_polygons의 셀 순서는 입력 순서와 다를 수 있어서 셀마다 들어있는 점으로 이름을 정함
+    cell_idx, seed_idx = shapely.STRtree(seeds).query(list(cells), predicate="contains")
+    cell_names = np.empty(len(cells), dtype=object)
+    cell_names[cell_idx] = names[seed_idx]
+    regions = {}
+    for name in dict.fromkeys(names):
+        parts = [c for c, n in zip(cells, cell_names) if n == name]
+        geom = shapely.intersection(shapely.union_all(parts), area)
+        if not geom.is_empty:
+            regions[name] = geom
+    return regions
+
+def build_sigungu(sido: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    points_by_sido = load_sigungu_points()
+    rows = []
+    for sido_row in sido.itertuples():
+        sigungu = points_by_sido[sido_row.CTP_KOR_NM]
+        if len(sigungu) == 1:
+            rows += [(name, sido_row.CTPRVN_CD, sido_row.geometry) for name in sigungu]
+            continue
+        regions = _regions(sido_row.geometry, *_seeds(sigungu))
+        rows += [(name, sido_row.CTPRVN_CD, geom) for name, geom in regions.items()]
+    gdf = gpd.GeoDataFrame(rows, columns=["SIG_KOR_NM", "CTPRVN_CD", "geometry"], crs=sido.crs)
+    gdf["geometry"] = shapely.make_valid(shapely.set_precision(gdf.geometry.values, PRECISION))
+    return gdf
+
+def evaluate(sido: gpd.GeoDataFrame, holdout: float = 0.1, seed: int = 0) -> None:
+    points_by_sido = load_sigungu_points()
+    rng = np.random.default_rng(seed)
+    total, errors = 0, []
+    for sido_row in sido.itertuples():
+        sigungu = points_by_sido[sido_row.CTP_KOR_NM]
+        if len(sigungu) == 1:
+            continue
+        coords, names = _seeds(sigungu)
+        held = rng.random(len(coords)) < holdout
+        regions = _regions(sido_row.geometry, coords[~held], names[~held])
+        for point, truth in zip(shapely.points(coords[held]), names[held]):
+            found = [name for name, geom in regions.items() if geom.contains(point)]
+            if not found:
+                continue
+            total += 1
+            if found[0] != truth and truth in regions:
+                errors.append(shapely.distance(point, regions[truth]) * M_PER_DEG)
+    errors = np.array(errors)
+    print(f"뺀 중심점 {total}개 중 다른 시군구로 찾은 점 {len(errors)}개 ({len(errors) / max(total, 1):.1%})")
+    if len(errors):
+        p50, p90, p99, p100 = np.percentile(errors, [50, 90, 99, 100])
+        print(f"실제 시군구 영역까지 거리(m) : 50% {p50:.0f}, 90% {p90:.0f}, 99% {p99:.0f}, 최대 {p100:.0f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluate", action="store_true")
+    parser.add_argument("--holdout", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sido = load_sido()
+    if args.evaluate:
+        evaluate(sido, args.holdout)
+        return
+    sigungu = build_sigungu(sido)
+    sigungu.to_file(SIGUNGU_PATH, driver="GeoJSON", COORDINATE_PRECISION=5)
+    print(f"시군구 {len(sigungu)}개 : {SIGUNGU_PATH}")
+
+if __name__ == "__main__":
+    main()
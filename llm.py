@@ -1,26 +1,38 @@
 import time
+import hashlib
+import json
 import os.path
+import logging
+import threading
 import zoneinfo
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime, timedelta
+from uuid import UUID
 
+import pandas as pd
 import feedparser
 from urllib.parse import urlparse
 from googlenewsdecoder import gnewsdecoder
 import trafilatura
+from trafilatura.settings import use_config
 
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
-import chromadb
-from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.documents import Document
-from langchain_core.tools import tool
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
 from langchain.chains.combine_documents import create_stuff_documents_chain
 
 from dotenv import load_dotenv
 
+import metrics
+from llm_cache import get_response_cache, make_key, CachedEmbeddings, EMBED_BATCH_SIZE
+from news_store import PartitionedStore, chunk_ids, lookback_start
+from news_summary import get_summary_store, NEWS_REFRESH_INTERVAL
+
 load_dotenv()
 
 KEYWORDS = [
@@ -40,12 +52,15 @@ openai_model = "gpt-4o-mini"
 chunk_size = 1000
 chunk_overlap = 150
 
-def _get_vs(persist_dir: str) -> Chroma:
-    return Chroma(
-        embedding_function=OpenAIEmbeddings(),
-        persist_directory=persist_dir,
-        collection_name=COLLECTION_NAME,
-    )
+embedding_model = "text-embedding-ada-002" # OpenAIEmbeddings 기본 모델
+
+def get_embeddings() -> CachedEmbeddings:
+    """디스크 캐시를 거치는 임베딩 (캐시에 없는 청크만 API 호출)"""
+    return CachedEmbeddings(OpenAIEmbeddings(model=embedding_model, chunk_size=EMBED_BATCH_SIZE),
+                            model=embedding_model)
+
+def _get_store(persist_dir: str) -> PartitionedStore:
+    return PartitionedStore(persist_dir, COLLECTION_NAME, get_embeddings())
 
 def _get_rss_feeds():
     query = "".join([word + "+OR+" if i != len(KEYWORDS)-1 else word for i, word in enumerate(KEYWORDS)]).replace(" ", "%20")
@@ -68,61 +83,310 @@ def keyword_hit(text: str, keywords: List[str]) -> bool:
     """키워드가 있으면 True 반환"""
     return any(k in text.upper() for k in keywords)
 
-def fetch_articles_from_rss(url: str,
-                            max_items_per_feed: int,
-                            lookback_days=LOOKBACK_DAYS,
-                            min_char=0) -> List[Dict]:
+FEED_STATE_PATH = "./rss_state.json" # 피드별 ETag, Last-Modified, 마지막으로 본 항목 ID
+FEED_SEEN_LIMIT = 500 # 피드별로 기억할 항목 ID 수
+INGEST_BATCH_SIZE = 8 # 벡터DB에 한번에 적재할 기사 수
+_feed_state_lock = threading.Lock()
+
+FETCH_WORKERS = 8 # 기사 다운로드 동시 요청 수
+PER_HOST_LIMIT = 2 # 호스트(언론사)당 동시 요청 수
+FETCH_TIMEOUT = 10 # 기사 다운로드 타임아웃(초)
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1) # 본문 추출 프로세스 수
+
+_host_limits: Dict[str, threading.Semaphore] = {}
+_host_limits_lock = threading.Lock()
+
+def _host_limit(link: str) -> threading.Semaphore:
+    host = urlparse(link).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.Semaphore(PER_HOST_LIMIT)
+        return _host_limits[host]
+
+_extractor: ProcessPoolExecutor | None = None
+_extractor_lock = threading.Lock()
+
+def _get_extractor() -> ProcessPoolExecutor:
+    """본문 추출 프로세스풀 (프로세스 시작이 느려서 수집마다 새로 만들지 않고 프로세스 안에서 재사용)"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+        return _extractor
+
+def _discard_extractor(extractor: ProcessPoolExecutor) -> None:
+    """깨진(작업 프로세스가 비정상 종료된) 프로세스풀을 버림, 다음 수집에서 새로 만듦"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is extractor:
+            _extractor = None
+    extractor.shutdown(wait=False, cancel_futures=True)
+
+def _download_config():
+    config = use_config()
+    config.set("DEFAULT", "DOWNLOAD_TIMEOUT", str(FETCH_TIMEOUT))
+    return config
+
+def _parse_entries(url: str,
+                   max_items_per_feed: int,
+                   lookback_days: int,
+                   state: Optional[Dict] = None) -> List[Dict]:
     """
-    feedparser(googlenewsdecoder) + trafilatura
-    feedparser로 구글뉴스 RSS에서 가져온 link를 디코더해
-    원문 링크 변환 후 trafilatura로 기사내용 추출
-    중복된 URL의 기사는 제외하고 반환
+    1단계 : RSS 항목을 파싱하고 다운로드 전에 걸러냄
+    봤던 링크, 발행일이 지난 기사, 제목에 키워드가 없는 기사는 스킵
+    state(피드별 ETag, Last-Modified, 마지막으로 본 항목 ID)가 있으면 조건부 요청을 보내고
+    304(변경없음)면 빈 리스트 반환, 이전에 본 항목은 스킵하고 state를 갱신 (저장은 호출한 쪽에서 적재가 끝난 뒤)
+    여기서 걸러진 항목만 seen에 추가, 반환하는 항목(id)은 호출한 쪽에서 적재가 끝난 뒤 추가
+    발행일이 없는 항목은 수정일, 둘 다 없으면 지금을 발행일로 봄
     """
-    articles = []
-    seen_urls = set()
+    seen_links = set()
     cutoff = datetime.now(tz=KOR) - timedelta(days=lookback_days) # 기본값 7일 (한국)
 
-    rss = feedparser.parse(url)
+    with metrics.timed("rss", urlparse(url).netloc) as call:
+        if state is None:
+            rss = feedparser.parse(url)
+        else:
+            rss = feedparser.parse(url, etag=state.get("etag"), modified=state.get("modified"))
+        call["ok"] = rss.get("status", 200) < 400 and not (rss.get("bozo") and not rss.entries)
+    if state is not None:
+        if rss.get("status") == 304:
+            return []
+        state["etag"] = rss.get("etag")
+        state["modified"] = rss.get("modified")
+    seen_ids = set(state.get("seen", [])) if state is not None else set()
+    skipped_ids = []
+
+    entries = []
     for entry in rss.entries[:max_items_per_feed]:
+        entry_id = entry.get("id") or entry.link
+        if entry_id in seen_ids: # 이전 수집에서 본 항목이면 스킵
+            continue
         title = entry.title
-        publish = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=KOR)
-        publish_ts = int(publish.timestamp())
-        link = entry.link
-        if "news.google.com" in urlparse(url).netloc:
-            link = gnewsdecoder(link)["decoded_url"]
-        downloaded = trafilatura.fetch_url(link) # feedparser로 RSS에서 추출한 기사 본문 추출
-        content = trafilatura.extract(downloaded,
-                                      include_comments=False,
-                                      include_tables=False,
-                                      favor_recall=True)
-
-        if link in seen_urls: # 봤던 기사의 링크면 스킵
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        publish = datetime.fromtimestamp(time.mktime(parsed), tz=KOR) if parsed else datetime.now(tz=KOR)
+        if entry.link in seen_links: # 봤던 기사의 링크면 스킵
+            skipped_ids.append(entry_id)
             continue
         if publish < cutoff: # 발행일이 지난(예전) 기사면 스킵
+            skipped_ids.append(entry_id)
             continue
         if not keyword_hit(title, KEYWORDS): # 기사 제목에 키워드가 없으면(관련성이 없으면) 스킵
+            skipped_ids.append(entry_id)
             continue
-        if not content or len(content.strip()) < min_char: # 본문 내용이없거나 너무 짧으면 스킵 (기본값 0:없음)
-            continue
-
-        doc = {
-            "link": link,
+        seen_links.add(entry.link)
+        entries.append({
+            "id": entry_id,
+            "link": entry.link,
             "title": title.strip(),
-            "content": content.strip(),
             "publish": publish.isoformat(), # Chroma 메타데이터 값으로 datetime을 허용하지않음
-            "publish_ts": publish_ts
-        }
-        seen_urls.add(link)
-        articles.append(doc)
-    return articles
+            "publish_ts": int(publish.timestamp()),
+            "google": "news.google.com" in urlparse(url).netloc
+        })
+
+    if state is not None:
+        state["seen"] = list(dict.fromkeys(skipped_ids + state.get("seen", [])))[:FEED_SEEN_LIMIT]
+    return entries
+
+def _download(entry: Dict) -> tuple[Dict, Optional[str]]:
+    """2단계 : 구글뉴스 링크를 원문 링크로 디코딩 후 기사 HTML 다운로드 (호스트당 동시 요청 제한)"""
+    link = entry["link"]
+    if entry["google"]:
+        with _host_limit(link), metrics.timed("google_news", "decode"):
+            link = gnewsdecoder(link)["decoded_url"]
+    with _host_limit(link), metrics.timed("article", urlparse(link).netloc) as call:
+        downloaded = trafilatura.fetch_url(link, config=_download_config())
+        call["ok"] = downloaded is not None
+        call["bytes"] = len(downloaded.encode("utf-8")) if downloaded else 0
+    return {**entry, "link": link}, downloaded
+
+def _extract(downloaded: str) -> Optional[str]:
+    """3단계 : (별도 프로세스) trafilatura로 기사 본문 추출"""
+    return trafilatura.extract(downloaded,
+                               include_comments=False,
+                               include_tables=False,
+                               favor_recall=True)
+
+def _process(entries: List[Dict], min_char: int) -> Iterator[tuple[Dict, Optional[Dict], bool]]:
+    """
+    2단계 스레드풀에서 디코딩, 다운로드 => 3단계 프로세스풀에서 본문 추출
+    처리가 끝난 항목부터 바로 (항목, 기사, 실패 여부) 반환
+    다운로드/추출에 실패한 항목은 (항목, None, True), 걸러진 항목은 (항목, None, False)
+    (원문 링크가 중복된 기사, 본문이 없거나 min_char보다 짧은 기사는 걸러짐)
+    """
+    if not entries:
+        return
 
-def build_vectorstore(docs: List[Dict],
-                      persist_dir=PERSIST_DIRECTORY) -> tuple[Chroma, List[Document]]:
-    """Document객체로 변환 => 청크 => 벡터DB화해서 ./chroma_db 폴더에 저장"""
-    if not docs:
-        return _get_vs(persist_dir), []
+    seen_urls = set()
+    extractor = _get_extractor()
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as downloader:
+        downloads = {downloader.submit(_download, entry): entry for entry in entries}
+        extracts: Dict[Future, tuple[Dict, Dict]] = {}
+        pending = set(downloads)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in downloads:
+                    try:
+                        entry, downloaded = future.result()
+                    except Exception as e:
+                        logging.getLogger(__name__).warning("기사 다운로드 실패 %s : %s", downloads[future]["link"], e)
+                        yield downloads[future], None, True
+                        continue
+                    if not downloaded: # 응답 오류, 타임아웃
+                        yield downloads[future], None, True
+                        continue
+                    if entry["link"] in seen_urls: # 봤던 기사의 링크면 스킵
+                        yield downloads[future], None, False
+                        continue
+                    seen_urls.add(entry["link"])
+                    try:
+                        extract = extractor.submit(_extract, downloaded)
+                    except BrokenProcessPool:
+                        logging.getLogger(__name__).exception("본문 추출 프로세스 풀 중단 %s", entry["link"])
+                        _discard_extractor(extractor)
+                        yield downloads[future], None, True
+                        continue
+                    extracts[extract] = (downloads[future], entry)
+                    pending.add(extract)
+                    continue
+
+                source, entry = extracts.pop(future)
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logging.getLogger(__name__).exception("본문 추출 실패 %s", entry["link"])
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_extractor(extractor)
+                    yield source, None, True
+                    continue
+                if not content or len(content.strip()) < min_char: # 본문 내용이없거나 너무 짧으면 스킵 (기본값 0:없음)
+                    yield source, None, False
+                    continue
+                yield source, {
+                    "link": entry["link"],
+                    "title": entry["title"],
+                    "content": content.strip(),
+                    "publish": entry["publish"],
+                    "publish_ts": entry["publish_ts"]
+                }, False
+
+def _process_entries(entries: List[Dict], min_char: int) -> Iterator[Dict]:
+    """_process()에서 본문 추출에 성공한 기사만 반환"""
+    for _, article, _ in _process(entries, min_char):
+        if article is not None:
+            yield article
+
+def iter_articles_from_rss(url: str,
+                           max_items_per_feed: int,
+                           lookback_days=LOOKBACK_DAYS,
+                           min_char=0) -> Iterator[Dict]:
+    """
+    feedparser(googlenewsdecoder) + trafilatura 단계별 스트리밍 수집
+    1단계 RSS 파싱/필터 => 2단계 스레드풀에서 디코딩, 다운로드 => 3단계 프로세스풀에서 본문 추출
+    """
+    yield from _process_entries(_parse_entries(url, max_items_per_feed, lookback_days), min_char)
+
+def _load_feed_state(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_feed_state(path: str, state: Dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _commit_feed_state(path: str, updated: Dict[str, Dict]) -> None:
+    """피드별 상태 저장 (다른 피드의 상태는 파일에 있는 그대로 유지)"""
+    if not updated:
+        return
+    with _feed_state_lock:
+        state = _load_feed_state(path)
+        state.update(updated)
+        _save_feed_state(path, state)
+
+def crawl_feeds(feeds: Optional[List[str]] = None,
+                max_items_per_feed: int = 20,
+                lookback_days=LOOKBACK_DAYS,
+                min_char=0,
+                state_path=FEED_STATE_PATH,
+                batch_size: int = INGEST_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    설정된 RSS 피드(기본값 전체)를 동시에 조건부 요청(ETag/Last-Modified)으로 수집
+    변경없는 피드(304)는 건너뛰고 피드별로 이전에 본 항목 이후의 새 항목만 다운로드/본문 추출
+    본문 추출이 끝난 기사를 batch_size건씩 반환
+    피드 상태는 그 피드의 기사가 모두 든 배치를 호출한 쪽이 처리하고 다음 배치를 요청할 때 state_path에 저장
+    (적재 중 예외로 중단되면 저장하지 않아서 다음 수집에서 같은 항목을 다시 받음)
+    다운로드/추출에 실패한 항목은 seen에 넣지 않고 그 피드의 ETag/Last-Modified도 이전 값으로 둬서 다음 수집에서 다시 시도
+    """
+    rss_feeds = _get_rss_feeds()
+    names = feeds or list(rss_feeds)
+    with _feed_state_lock:
+        state = _load_feed_state(state_path)
+    updated = {name: dict(state.get(name, {})) for name in names} # 저장 전까지 갱신할 피드 상태
+    handled: Dict[str, List[str]] = {name: [] for name in names} # 적재했거나 걸러진 항목 ID
+    failed = set() # 다운로드/추출에 실패한 항목이 있는 피드
+
+    def feed_state(name: str) -> Dict:
+        feed = dict(updated[name])
+        feed["seen"] = list(dict.fromkeys(handled[name] + feed.get("seen", [])))[:FEED_SEEN_LIMIT]
+        if name in failed:
+            feed["etag"] = state.get(name, {}).get("etag")
+            feed["modified"] = state.get(name, {}).get("modified")
+        return feed
+
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        futures = {name: executor.submit(_parse_entries, rss_feeds[name], max_items_per_feed,
+                                         lookback_days, updated[name]) for name in names}
+    entries = []
+    remaining: Dict[str, int] = {} # 피드별 처리가 끝나지 않은 항목 수
+    for name, future in futures.items():
+        try:
+            feed_entries = future.result()
+        except Exception as e:
+            logging.getLogger(__name__).warning("%s RSS 수집 실패 : %s", name, e)
+            continue
+        print(f" - {name} : 새 항목 {len(feed_entries)}건")
+        entries.extend({**entry, "feed": name} for entry in feed_entries)
+        remaining[name] = len(feed_entries)
+
+    # 새 항목이 없는 피드(304 등)는 바로 저장
+    _commit_feed_state(state_path, {name: feed_state(name) for name, count in remaining.items() if count == 0})
+    done = [] # 처리가 끝났고 아직 저장하지 않은 피드
+    batch = []
+    for entry, article, error in _process(entries, min_char):
+        if error:
+            failed.add(entry["feed"])
+        else:
+            handled[entry["feed"]].append(entry["id"])
+        remaining[entry["feed"]] -= 1
+        if remaining[entry["feed"]] == 0:
+            done.append(entry["feed"])
+        if article is not None:
+            batch.append(article)
+        if len(batch) >= batch_size:
+            ready, done = done, []
+            yield batch
+            batch = []
+            _commit_feed_state(state_path, {name: feed_state(name) for name in ready})
+    if batch:
+        yield batch
+    _commit_feed_state(state_path, {name: feed_state(name) for name in done})
+
+def fetch_articles_from_rss(url: str,
+                            max_items_per_feed: int,
+                            lookback_days=LOOKBACK_DAYS,
+                            min_char=0) -> List[Dict]:
+    """iter_articles_from_rss() 결과를 리스트로 반환"""
+    return list(iter_articles_from_rss(url, max_items_per_feed, lookback_days, min_char))
 
-    lang_docs: List[Document] = []
+def _split_articles(docs: List[Dict]) -> tuple[List[Document], Dict[str, List[str]]]:
+    """기사를 청크로 나누고 기사 링크별 고정 청크 ID를 붙임"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks: List[Document] = []
+    ids_by_link: Dict[str, List[str]] = {}
     for d in docs:
         meta = {
             "link": d["link"],
@@ -130,66 +394,57 @@ def build_vectorstore(docs: List[Dict],
             "publish": d["publish"],
             "publish_ts": d["publish_ts"]
         }
-        lang_docs.append(Document(page_content=d["content"], metadata=meta))
-
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    chunks = splitter.split_documents(lang_docs)
+        doc_chunks = splitter.split_documents([Document(page_content=d["content"], metadata=meta)])
+        ids = chunk_ids(d["link"], len(doc_chunks))
+        for chunk, chunk_id in zip(doc_chunks, ids):
+            chunk.id = chunk_id
+        chunks.extend(doc_chunks)
+        ids_by_link[d["link"]] = ids
+    return chunks, ids_by_link
+
+def _add_articles(store: PartitionedStore, docs: List[Dict]) -> List[Document]:
+    """
+    청크를 발행일 파티션에 고정 ID로 추가하고 적재 목록에 기록
+    이미 적재된 기사는 이전 청크를 먼저 삭제 (청크 수가 줄거나 발행일이 바뀌어도 이전 청크가 남지 않음)
+    """
+    chunks, ids_by_link = _split_articles(docs)
+    store.delete_articles(d["link"] for d in docs)
+    if chunks:
+        store.add_documents(chunks)
+    for d in docs:
+        store.manifest.add(d["link"], d["publish_ts"], ids_by_link[d["link"]])
+    return chunks
 
-    vs = Chroma.from_documents(
-        documents=chunks,
-        embedding=OpenAIEmbeddings(),
-        persist_directory=persist_dir,
-        collection_name=COLLECTION_NAME
-    )
-    return vs, chunks
+def build_vectorstore(docs: List[Dict],
+                      persist_dir=PERSIST_DIRECTORY) -> tuple[PartitionedStore, List[Document]]:
+    """Document객체로 변환 => 청크 => 벡터DB화해서 ./chroma_db 폴더에 발행일별 컬렉션으로 저장"""
+    store = _get_store(persist_dir)
+    if not docs:
+        return store, []
+    docs = list({d["link"]: d for d in docs}.values()) # 같은 링크는 1번만
+    return store, _add_articles(store, docs)
 
 def check_vectorstore(docs: List[Dict],
                       persist_dir=PERSIST_DIRECTORY,
-                      lookback_days=LOOKBACK_DAYS) -> tuple[Chroma, List[Document], int]:
-    """오래된 기사 삭제 새로운 URL의 기사 DB에 추가"""
-    client = chromadb.PersistentClient(path=persist_dir)
-    collection = client.get_collection(COLLECTION_NAME)
-
-    cutoff_ts = int((datetime.now(tz=KOR) - timedelta(days=lookback_days)).timestamp())
-    old_chunks_num = len(collection.get(
-        where={"publish_ts": {"$lt": cutoff_ts}}
-    )["metadatas"])
-    collection.delete( # 발행일이 기준일수보다 지난 데이터 삭제
-        where={"publish_ts": {"$lt": cutoff_ts}}
-    )
-
-    metas = collection.get()
-    exist_link = set([meta["link"] for meta in metas["metadatas"]])
-
-    lang_docs: list[Document] = []
-    for d in docs:
-        if d["link"] not in exist_link:
-            meta = {
-                "link": d["link"],
-                "title": d["title"],
-                "publish": d["publish"],
-                "publish_ts": d["publish_ts"]
-            }
-            lang_docs.append(Document(page_content=d["content"], metadata=meta))
-
-    if not lang_docs:
-        return _get_vs(persist_dir), [], old_chunks_num
+                      lookback_days=LOOKBACK_DAYS) -> tuple[PartitionedStore, List[Document], int]:
+    """
+    오래된 기사 삭제 새로운 URL의 기사 DB에 추가
+    중복 확인은 적재 목록(news_store.IngestManifest)으로, 만료는 기준일 이전 발행일 컬렉션을 통째로 삭제
+    """
+    store = _get_store(persist_dir)
+    store.migrate(COLLECTION_NAME) # 발행일별로 나누기 전의 단일 컬렉션
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    new_chunks = splitter.split_documents(lang_docs)
+    cutoff_ts = lookback_start(lookback_days)
+    deleted = store.drop_before(cutoff_ts)
 
-    vs = Chroma.from_documents(
-        documents=new_chunks,
-        embedding=OpenAIEmbeddings(),
-        persist_directory=persist_dir,
-        collection_name=COLLECTION_NAME,
-    )
-    return vs, new_chunks, old_chunks_num
+    exist_link = store.manifest.known(d["link"] for d in docs)
+    new_docs = list({d["link"]: d for d in docs
+                     if d["link"] not in exist_link and d["publish_ts"] >= cutoff_ts}.values())
+    if not new_docs:
+        return store, [], deleted
+    return store, _add_articles(store, new_docs), deleted
 
-def build_llm():
-    llm = ChatOpenAI(model=openai_model, temperature=0.1)
-    prompt = ChatPromptTemplate.from_template(
-        """
+SUMMARY_TEMPLATE = """
         당신은 경제 신문 기자입니다. 제공된 컨텍스트만을 사용해 한국 독자를 대상으로
         유가 관련 핵심 이슈를 간결하고 유용하게 요약하세요.
 
@@ -206,91 +461,256 @@ def build_llm():
         <참고 컨텍스트>
         {context}
         """
-    )
-    return create_stuff_documents_chain(llm, prompt)
 
-def summarize_oil_news(vs: Chroma,
-                       question: str,
-                       k: int) -> str:
-    """llm모델에 로컬DB에서 상위 k개의 관련성 있는 기사를 context로 주면서 질문"""
-    if vs is None:
-        return "벡터 스토어가 비어 있습니다. 먼저 RSS 수집을 실행해주세요."
+class _MetricsCallback(BaseCallbackHandler):
+    """llm 호출별 응답시간, 결과, 토큰 사용량을 metrics에 기록"""
+    def __init__(self):
+        self.started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        start = self.started.pop(run_id, None)
+        if start is not None:
+            metrics.record_call("openai", "chat", time.perf_counter() - start, ok=True)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    metrics.record_tokens(openai_model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        start = self.started.pop(run_id, None)
+        if start is not None:
+            metrics.record_call("openai", "chat", time.perf_counter() - start, ok=False)
+
+_metrics_callback = _MetricsCallback()
+
+def _chat_model() -> ChatOpenAI:
+    """스트리밍에서도 토큰 사용량을 받도록 stream_usage를 켜고 지표를 기록하는 ChatOpenAI"""
+    return ChatOpenAI(model=openai_model, temperature=0.1, stream_usage=True, callbacks=[_metrics_callback])
+
+def build_llm():
+    llm = _chat_model()
+    prompt = ChatPromptTemplate.from_template(SUMMARY_TEMPLATE)
+    return create_stuff_documents_chain(llm, prompt)
 
+def _summary_request(store: PartitionedStore,
+                     question: str,
+                     k: int,
+                     lookback_days: int) -> tuple[Dict, List[Document], str]:
+    """llm 입력값, context로 사용할 청크, 응답 캐시 키 반환"""
     question = f"유가 관련 핵심 이슈만 요약. 겹치는 내용은 하나로 병합.\n\n원문 요청: {question}"
-    retriever = vs.as_retriever(search_kwargs={"k": k})
-    k_context = retriever.invoke(question)
-    llm = build_llm()
-    return llm.invoke({"question": question, "context": k_context})
+    k_context = store.search(question, k=k, since_ts=lookback_start(lookback_days))
+    key = make_key(template=SUMMARY_TEMPLATE, # 같은 질문, 같은 청크면 llm 호출 없이 반환
+                   model=openai_model,
+                   chunks=[doc.id or hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest() for doc in k_context],
+                   question=question)
+    return {"question": question, "context": k_context}, k_context, key
+
+def _stream_summary(inputs: Dict, key: str) -> Iterator[str]:
+    """응답 캐시에 있으면 한번에, 없으면 llm 응답을 토큰 단위로 반환하고 끝나면 캐시에 저장"""
+    cache = get_response_cache()
+    if (cached := cache.get(key)) is not None:
+        yield cached
+        return
+    answer = []
+    for token in build_llm().stream(inputs):
+        answer.append(token)
+        yield token
+    cache.set(key, "".join(answer))
+
+def _summarize(store: PartitionedStore,
+               question: str,
+               k: int,
+               lookback_days: int) -> tuple[str, List[Document]]:
+    """요약 결과와 context로 사용한 청크 반환"""
+    if store is None:
+        return "벡터 스토어가 비어 있습니다. 먼저 RSS 수집을 실행해주세요.", []
+    inputs, k_context, key = _summary_request(store, question, k, lookback_days)
+    return "".join(_stream_summary(inputs, key)), k_context
+
+def summarize_oil_news(store: PartitionedStore,
+                       question: str,
+                       k: int,
+                       lookback_days=LOOKBACK_DAYS) -> str:
+    """llm모델에 로컬DB에서 최근 lookback_days일 기사 중 상위 k개의 관련성 있는 기사를 context로 주면서 질문"""
+    return _summarize(store, question, k, lookback_days)[0]
+
+def summarize_oil_news_stream(store: PartitionedStore,
+                              question: str,
+                              k: int,
+                              lookback_days=LOOKBACK_DAYS) -> Iterator[str]:
+    """summarize_oil_news()의 스트리밍 버전, 요약을 토큰 단위로 반환 (st.write_stream 용)"""
+    if store is None:
+        yield "벡터 스토어가 비어 있습니다. 먼저 RSS 수집을 실행해주세요."
+        return
+    inputs, _, key = _summary_request(store, question, k, lookback_days)
+    yield from _stream_summary(inputs, key)
+
+def _sources(chunks: List[Document]) -> List[Dict]:
+    """context 청크의 출처 기사 (링크 중복 제거, 최신순)"""
+    articles = {doc.metadata["link"]: {"title": doc.metadata["title"],
+                                       "link": doc.metadata["link"],
+                                       "publish": doc.metadata["publish"]} for doc in chunks}
+    return sorted(articles.values(), key=lambda a: a["publish"], reverse=True)
+
+def run_pipeline_stream(rss: Optional[str],
+                        max_items_per_feed: int,
+                        k: int,
+                        lookback_days=LOOKBACK_DAYS) -> Iterator[str]:
+    """
+    최종 실행 (rss가 None이면 설정된 모든 피드에서 새 기사만 수집)
+    요약은 토큰 단위로 반환하고 끝나면 뉴스 요약 저장소에 저장
+    """
+    print("1) RSS 수집, 본문 추출 및 임베딩 중 (추출이 끝난 기사부터 배치로 벡터DB에 추가)")
+    batches = crawl_feeds([rss] if rss else None,
+                          max_items_per_feed=max_items_per_feed,
+                          lookback_days=lookback_days)
+    vs = None
+    count, new_chunks, delete_chunks = 0, 0, 0
+    for batch in batches: # 다음 배치를 요청할 때 적재가 끝난 피드의 상태가 저장됨
+        vs, chunks, deleted = check_vectorstore(batch, lookback_days=lookback_days)
+        count, new_chunks, delete_chunks = count + len(batch), new_chunks + len(chunks), delete_chunks + deleted
+    if vs is None: # 새 기사가 없어도 기준일수가 지난 데이터는 삭제
+        vs, _, delete_chunks = check_vectorstore([], lookback_days=lookback_days)
+    print(f" - 수집 성공 : {count}건")
+    print(f" - 새로운 청크 저장 : {new_chunks}개")
+    print(f" - 삭제한 청크 개수 : {delete_chunks}개")
+    print(f" - 벡터DB 청크 개수 : {vs.count() + delete_chunks - new_chunks} -> {vs.count()}")
+
+    print("2) 요약 실행 중...")
+    inputs, context, key = _summary_request(vs,
+                                            question=f"지난 {lookback_days}일간 국제유가 등락 요인과 국내 유가의 시사점은?",
+                                            k=k,
+                                            lookback_days=lookback_days)
+    tokens = []
+    for token in _stream_summary(inputs, key):
+        tokens.append(token)
+        yield token
+    answer = "".join(tokens)
+    get_summary_store().save(answer, _sources(context), lookback_days)
+    print("\n===== 요약 결과 =====\n")
+    print(answer)
 
-def run_pipeline(rss: str,
+def run_pipeline(rss: Optional[str],
                  max_items_per_feed: int,
                  k: int,
                  lookback_days=LOOKBACK_DAYS) -> str:
-    """최종 실행"""
-    print("1) RSS 수집 및 본문 추출 중...")
-    articles = fetch_articles_from_rss(_get_rss_feeds().get(rss),
-                                       max_items_per_feed=max_items_per_feed,
+    """run_pipeline_stream()의 결과를 한번에 반환"""
+    return "".join(run_pipeline_stream(rss, max_items_per_feed, k, lookback_days))
+
+NEWS_MAX_ITEMS = 20 # 피드당 최대 기사 수
+NEWS_TOP_K = 8 # 요약에 사용할 청크 수
+NEWS_CHECK_INTERVAL = 10 * 60 # 백그라운드 작업의 요약 확인 주기(초)
+
+_news_lock = threading.Lock()
+
+def refresh_news_stream(max_age: float = NEWS_REFRESH_INTERVAL,
+                        lookback_days=LOOKBACK_DAYS) -> Iterator[str]:
+    """
+    저장된 요약이 max_age초보다 오래됐으면 run_pipeline_stream()을 실행해서 요약을 토큰 단위로 반환
+    아니면 저장된 요약을 한번에 반환
+    이미 다른 스레드가 실행 중이면 끝날 때까지 기다렸다가 그 결과를 반환 (동시에 1번만 실행)
+    """
+    with _news_lock:
+        latest = get_summary_store().latest()
+        if latest is not None and time.time() - latest["created_at"] < max_age:
+            yield latest["text"]
+            return
+        yield from run_pipeline_stream(rss=None, # 설정된 모든 RSS 피드
+                                       max_items_per_feed=NEWS_MAX_ITEMS,
+                                       k=NEWS_TOP_K,
                                        lookback_days=lookback_days)
-    print(f" - 수집 성공 : {len(articles)}건")
-
-    if not os.path.exists(PERSIST_DIRECTORY):
-        print("2) 임베딩 및 벡터DB 구축 중...")
-        vs, chunks = build_vectorstore(articles)
-        print(f" - 청크 저장 : {len(chunks)}개")
-    else:
-        print("2) 로컬 벡터DB에서 기준일수가 지난 데이터 삭제 및 신규 RSS 임베딩")
-        vs, new_chunks, delete_chunks = check_vectorstore(articles, lookback_days=lookback_days)
-        print(f" - 새로운 청크 저장 : {len(new_chunks)}개")
-        print(f" - 삭제한 청크 개수 : {delete_chunks}개")
-        print(f" - 벡터DB 청크 개수 : {vs._collection.count() + delete_chunks - len(new_chunks)} -> {vs._collection.count()}")
-
-    print("3) 요약 실행 중...")
-    answer = summarize_oil_news(vs,
-                                question=f"지난 {lookback_days}일간 국제유가 등락 요인과 국내 유가의 시사점은?",
-                                k=k)
-    print("\n===== 요약 결과 =====\n")
-    print(answer)
-    return answer
+
+def refresh_news(max_age: float = NEWS_REFRESH_INTERVAL,
+                 lookback_days=LOOKBACK_DAYS) -> Dict | None:
+    """refresh_news_stream()을 끝까지 실행하고 최신 요약 반환"""
+    for _ in refresh_news_stream(max_age, lookback_days):
+        pass
+    return get_summary_store().latest()
+
+def run_news_worker(stop: threading.Event,
+                    interval: float = NEWS_CHECK_INTERVAL) -> None:
+    """백그라운드 뉴스 수집/요약, 요약이 NEWS_REFRESH_INTERVAL보다 오래되면 다시 실행"""
+    while not stop.is_set():
+        try:
+            refresh_news()
+        except Exception:
+            logging.getLogger(__name__).exception("뉴스 요약 실패")
+        stop.wait(interval)
 
 
 # --------------------------------------------
 
 
 from func import station_info_search
+from recommend import score_stations, render_recommendation
 
-@tool("station_info_search", return_direct=False)
-def station_info_search_tool(station_id: str) -> List[Dict]: # AI사용 사용자 정의 함수
-    """station_id로 주유소의 상세정보를 조회합니다."""
-    return station_info_search(station_id)
+def run_agent_stream(stations: pd.DataFrame,
+                     weight_price: float,
+                     weight_distance: float,
+                     topk: int) -> Iterator[str]:
+    """
+    주유소 추천 (토큰 단위로 반환, st.write_stream 용)
+    가격, 거리 가중치로 점수를 계산해서(recommend.score_stations) 최적의 주유소를 고르고
+    상세정보(station_info_search)를 토대로 llm모델은 안내 문장만 작성
+    OPENAI API키가 없거나 llm 호출에 실패하면 템플릿으로 작성
+    """
+    if stations is None or stations.empty:
+        yield "주유소 데이터가 없습니다."
+        return
+    ranked = score_stations(stations, weight_price, weight_distance, topk)
+    best = ranked.iloc[0]
+    detail = station_info_search(best["UNI_ID"])
+    fallback = render_recommendation(best, detail)
+    if not os.getenv("OPENAI_API_KEY"):
+        yield fallback
+        return
+
+    sys = ("당신은 합리적인 의사결정을 돕는 어시스턴트입니다.\n"
+           "추천 주유소는 이미 점수로 결정되었습니다. 다른 주유소를 고르지 마세요.\n"
+           "주유소의 상세정보를 토대로 한글로 주소, 상표, 기름가격, 전화번호, 세차장 유무를 불릿형태로 작성하고 추천 근거를 한 문장으로 덧붙이세요.\n"
+           "제목 양식을 준수하세요.\n"
+           "추천드리는 주유소는 **OOO**입니다.")
+    human = ("(추천 주유소 JSON): {best}\n"
+             "(상세정보 JSON): {detail}\n"
+             "(추천 근거): {reason}")
+    inputs = {
+        "best": best.drop(labels="REASON").to_json(force_ascii=False),
+        "detail": detail.to_json(orient="records", force_ascii=False),
+        "reason": best["REASON"]
+    }
 
-def run_agent(stations: List[Dict],
+    cache = get_response_cache() # 같은 주유소, 같은 상세정보면 llm 호출 없이 반환
+    key = make_key(template=[sys, human], model=openai_model, inputs=inputs)
+    if (cached := cache.get(key)) is not None:
+        yield cached
+        return
+
+    prompt = ChatPromptTemplate.from_messages([("system", sys), ("human", human)])
+    llm = _chat_model()
+    tokens = []
+    try:
+        for chunk in (prompt | llm).stream(inputs):
+            if chunk.content:
+                tokens.append(chunk.content)
+                yield chunk.content
+    except Exception:
+        logging.getLogger(__name__).exception("주유소 추천 문장 작성 실패 (받은 토큰 %d개)", len(tokens))
+        if tokens: # 중간에 끊긴 응답은 캐시에 저장하지 않고 템플릿 안내를 덧붙임
+            yield "\n\n(응답이 중간에 끊겨 기본 안내로 대신합니다)\n\n"
+        yield fallback
+        return
+    if not tokens: # 빈 응답이면 템플릿으로 안내
+        yield fallback
+        return
+    cache.set(key, "".join(tokens)) # 끝까지 받은 응답만 저장
+
+def run_agent(stations: pd.DataFrame,
               weight_price: float,
               weight_distance: float,
-              topk: int) -> Tuple[Optional[str], Optional[List[Dict]], str]:
-    if not stations:
-        return None, None, "주유소 데이터가 없습니다."
-    top_list = stations[:topk]
-
-    sys = (f"당신은 합리적인 의사결정을 돕는 어시스턴트입니다.\n "
-              f"- 가격 가중치: {weight_price:.2f}, 거리 가중치: {weight_distance:.2f}\n"
-              f"JSON을 검토하고 최적의 station_id를 선택한 후 반드시 `station_info_search`를 1회 호출하여 상세정보를 얻으세요.\n"
-              f"`station_info_search`함수를 호출하여 얻은 주유소의 상세정보를 토대로 한글로 주소, 상표, 기름가격, 전화번호, 세차장 유무를 불릿형태로 작성하세요.\n"
-              f"제목 양식을 준수하세요.\n"
-              f"추천드리는 주유소는 **OOO**입니다.")
-    human = ("(JSON): {top_list}\n"
-             "최적의 주유소 한 곳을 골라 `station_info_search`를 1회만 호출하세요.")
-
-    llm = ChatOpenAI(model=openai_model, temperature=0.1)
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", sys),
-            ("human", human),
-            MessagesPlaceholder("agent_scratchpad"),
-        ]
-    )
-
-    tools = [station_info_search_tool]
-    agent = create_tool_calling_agent(llm, tools, prompt)
-    executor = AgentExecutor(agent=agent, tools=tools, verbose=True) # verbose 실행과정 출력유무
-    result = executor.invoke({"top_list": top_list})
-    return result.get("output", "추천드릴 만한 주유소가 없습니다")
\ No newline at end of file
+              topk: int) -> str:
+    """run_agent_stream()의 결과를 한번에 반환"""
+    return "".join(run_agent_stream(stations, weight_price, weight_distance, topk))
@@ -0,0 +1,152 @@
+"""
+llm모델 응답 캐시, 임베딩 캐시 (SQLite)
+ResponseCache : 프롬프트 템플릿, 모델, 검색된 청크 ID, 입력값으로 만든 해시를 키로 응답을 디스크에 저장해서
+같은 요청은 세션/프로세스에 상관없이 llm 호출 없이 반환
+전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 응답부터 삭제
+CachedEmbeddings : 정규화한 청크 본문 + 임베딩 모델명의 해시를 키로 임베딩 벡터를 저장해서
+다른 URL로 중복 게재된 기사나 벡터DB를 다시 만들 때 새로운 본문만 임베딩
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+import metrics
+
+LLM_CACHE_PATH = "./llm_cache.db"
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS response_accessed_at ON response (accessed_at);
+"""
+
+def make_key(**parts) -> str:
+    """키 구성요소(템플릿, 모델, 청크 ID, 입력값 등)를 정렬된 JSON으로 만들어 sha256 해시"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str) -> str | None:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT value FROM response WHERE key = ?", (key,)).fetchone()
+            metrics.record_cache("llm_response", "miss" if row is None else "hit")
+            if row is None:
+                return None
+            conn.execute("UPDATE response SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?)",
+                         (key, value, size, time.time()))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+            for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM response WHERE key != ? ORDER BY accessed_at", (key,)).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM response WHERE key = ?", (old_key,))
+                total -= old_size
+
+_response_cache: ResponseCache | None = None
+_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """프로세스 공용 llm 응답 캐시"""
+    global _response_cache
+    with _lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+EMBEDDING_CACHE_PATH = "./embedding_cache.db"
+EMBED_BATCH_SIZE = 128 # 임베딩 API 1회 요청당 청크 수
+EMBED_CONCURRENCY = 2 # 임베딩 API 동시 요청 수
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFC) 후 연속된 공백을 하나로"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+class CachedEmbeddings(Embeddings):
+    """캐시에 없는 청크만 배치로 나눠 동시에(최대 concurrency개) 임베딩 API 호출"""
+    def __init__(self,
+                 underlying: Embeddings,
+                 model: str,
+                 path: str = EMBEDDING_CACHE_PATH,
+                 batch_size: int = EMBED_BATCH_SIZE,
+                 concurrency: int = EMBED_CONCURRENCY):
+        self.underlying = underlying
+        self.model = model
+        self.path = path
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        with closing(self._connect()) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        with closing(self._connect()) as conn:
+            vectors = {}
+            for i in range(0, len(unique), 500): # SQLite 변수 개수 제한
+                part = unique[i:i+500]
+                rows = conn.execute(f"SELECT key, vector FROM embedding WHERE key IN ({','.join('?' * len(part))})", part)
+                vectors.update({key: array("d", blob).tolist() for key, blob in rows})
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        metrics.record_cache("embedding", "hit", len(unique) - len(missing))
+        metrics.record_cache("embedding", "miss", len(missing))
+        if missing:
+            miss_keys = list(missing)
+            batches = [miss_keys[i:i+self.batch_size] for i in range(0, len(miss_keys), self.batch_size)]
+
+            def embed(batch: list[str]) -> List[List[float]]:
+                with metrics.timed("openai", "embeddings"):
+                    return self.underlying.embed_documents([missing[k] for k in batch])
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                results = executor.map(embed, batches)
+                for batch, embedded in zip(batches, results):
+                    vectors.update(zip(batch, embedded))
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("INSERT OR REPLACE INTO embedding VALUES (?, ?)",
+                                 [(key, array("d", vectors[key]).tobytes()) for key in miss_keys])
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        with metrics.timed("openai", "embeddings"):
+            return self.underlying.embed_query(text)
@@ -0,0 +1,37 @@
+"""
+llm 기능 지연 로딩
+llm.py는 langchain, chromadb, trafilatura, feedparser 등을 import해서 시작이 느리므로
+화면(app.py)은 이 모듈을 통해 처음 사용할 때 llm.py를 import
+뉴스 요약 스레드는 스레드 안에서 import해서 첫 화면 표시를 막지 않음
+"""
+import importlib
+import logging
+import threading
+from typing import Iterator
+
+from news_summary import NEWS_REFRESH_INTERVAL
+
+def _llm():
+    return importlib.import_module("llm")
+
+def run_agent_stream(*args, **kwargs) -> Iterator[str]:
+    """llm.run_agent_stream()"""
+    return _llm().run_agent_stream(*args, **kwargs)
+
+def refresh_news_stream(max_age: float = NEWS_REFRESH_INTERVAL, **kwargs) -> Iterator[str]:
+    """llm.refresh_news_stream()"""
+    return _llm().refresh_news_stream(max_age, **kwargs)
+
+def _news_worker(stop: threading.Event) -> None:
+    try:
+        llm = _llm()
+    except Exception:
+        logging.getLogger(__name__).exception("llm 모듈 import 실패")
+        return
+    llm.run_news_worker(stop)
+
+def start_news_worker() -> threading.Event:
+    """뉴스 요약 스레드 시작 (llm.py는 스레드 안에서 import), 반환된 Event를 set하면 종료"""
+    stop = threading.Event()
+    threading.Thread(target=_news_worker, args=(stop,), name="news-worker", daemon=True).start()
+    return stop
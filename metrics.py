@@ -0,0 +1,218 @@
+"""
+외부 호출 / 캐시 지표 수집 (프로세스 단위, 표준 라이브러리만 사용)
+oil_external_call_seconds : 서비스, 엔드포인트별 응답시간 히스토그램
+oil_external_calls_total : 서비스, 엔드포인트, 결과(ok, error)별 호출 수
+oil_external_bytes_total : 서비스, 엔드포인트별 응답 크기
+oil_llm_tokens_total : 모델, 종류(prompt, completion)별 토큰 사용량
+oil_cache_requests_total : 캐시, 결과(hit, stale, miss, wait)별 조회 수
+oil_api_queue_seconds : 서비스, 우선순위별 호출 한도 대기시간 히스토그램
+oil_api_quota_remaining : 서비스별 남은 일일 호출 수 (게이지)
+oil_external_retries_total : 서비스, 엔드포인트, 종류(retry, hedge)별 추가 요청 수
+oil_circuit_open : 서비스별 서킷 브레이커 상태 (1이면 호출 차단, 게이지)
+render_prometheus()로 Prometheus 텍스트 형식, summary()로 화면 출력용 표를 반환
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0) # 초
+
+HELP = {
+    "oil_external_call_seconds": ("histogram", "외부 API 응답시간(초)"),
+    "oil_external_calls_total": ("counter", "외부 API 호출 수"),
+    "oil_external_bytes_total": ("counter", "외부 API 응답 크기(byte)"),
+    "oil_llm_tokens_total": ("counter", "llm 토큰 사용량"),
+    "oil_cache_requests_total": ("counter", "캐시 조회 수"),
+    "oil_api_queue_seconds": ("histogram", "외부 API 호출 한도 대기시간(초)"),
+    "oil_api_quota_remaining": ("gauge", "남은 일일 호출 수"),
+    "oil_external_retries_total": ("counter", "외부 API 재시도, 헤징 요청 수"),
+    "oil_circuit_open": ("gauge", "서킷 브레이커 열림 여부")
+}
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1) # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """버킷 안에서 선형 보간한 분위수 (마지막 버킷이면 버킷 하한)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = LATENCY_BUCKETS[i-1] if i > 0 else 0.0
+                if i == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        return LATENCY_BUCKETS[-1]
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], _Histogram] = {}
+_gauges: dict[tuple[str, tuple], float] = {}
+
+def _key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, value: float, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        if key not in _histograms:
+            _histograms[key] = _Histogram()
+        _histograms[key].observe(value)
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+def record_call(service: str, endpoint: str, seconds: float, ok: bool, size: int = 0) -> None:
+    """외부 호출 1건 기록 (응답시간, 결과, 응답 크기)"""
+    observe("oil_external_call_seconds", seconds, service=service, endpoint=endpoint)
+    inc("oil_external_calls_total", service=service, endpoint=endpoint, outcome="ok" if ok else "error")
+    if size:
+        inc("oil_external_bytes_total", size, service=service, endpoint=endpoint)
+
+@contextmanager
+def timed(service: str, endpoint: str) -> Iterator[dict]:
+    """
+    with 블록을 외부 호출 1건으로 기록, 예외가 나면 error
+    블록 안에서 반환된 dict에 bytes(응답 크기), ok(실패 여부)를 넣을 수 있음
+    """
+    info = {"bytes": 0, "ok": True}
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException:
+        info["ok"] = False
+        raise
+    finally:
+        record_call(service, endpoint, time.perf_counter() - start, info["ok"], info["bytes"])
+
+def record_tokens(model: str, prompt: int, completion: int) -> None:
+    if prompt:
+        inc("oil_llm_tokens_total", prompt, model=model, kind="prompt")
+    if completion:
+        inc("oil_llm_tokens_total", completion, model=model, kind="completion")
+
+def record_cache(cache: str, result: str, count: int = 1) -> None:
+    """
+    result : hit(유효), stale(만료됐지만 반환), miss(새로 조회), wait(같은 키 조회를 기다림)
+    fallback(조회에 실패해서 max_stale이 지난 값을 반환)
+    """
+    if count:
+        inc("oil_cache_requests_total", count, cache=cache, result=result)
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _gauges.clear()
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in labels + extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+    with _lock:
+        counters = sorted(list(_counters.items()) + list(_gauges.items()))
+        histograms = sorted((key, (list(h.counts), h.sum, h.count)) for key, h in _histograms.items())
+
+    lines = []
+    names = sorted({name for (name, _), _ in counters} | {name for (name, _), _ in histograms})
+    for name in names:
+        kind, text = HELP.get(name, ("untyped", name))
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        for (n, labels), value in counters:
+            if n == name:
+                lines.append(f"{name}{_labels(labels)} {value:g}")
+        for (n, labels), (counts, total, count) in histograms:
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, c in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{name}_bucket{_labels(labels, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+def summary() -> dict[str, list[dict]]:
+    """
+    화면 출력용 표
+    calls : 서비스, 엔드포인트별 호출 수, 오류 수, p50/p95(초), 응답 크기
+    caches : 캐시별 hit, stale, miss, wait, fallback(miss 중 만료된 값 반환) 수와 적중률
+    tokens : 모델, 종류별 토큰 수
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (h.quantile(0.5), h.quantile(0.95), h.count) for key, h in _histograms.items()}
+
+    calls = []
+    for (name, labels), (p50, p95, count) in sorted(histograms.items()):
+        if name != "oil_external_call_seconds":
+            continue
+        label = dict(labels)
+        errors = counters.get(_key("oil_external_calls_total", {**label, "outcome": "error"}), 0)
+        size = counters.get(_key("oil_external_bytes_total", label), 0)
+        calls.append({**label, "calls": count, "errors": int(errors), "p50": p50, "p95": p95, "bytes": int(size)})
+
+    caches: dict[str, dict] = {}
+    tokens = []
+    for (name, labels), value in sorted(counters.items()):
+        label = dict(labels)
+        if name == "oil_cache_requests_total":
+            row = caches.setdefault(label["cache"], {"cache": label["cache"], "hit": 0, "stale": 0, "miss": 0, "wait": 0,
+                                                     "fallback": 0})
+            row[label["result"]] = int(value)
+        elif name == "oil_llm_tokens_total":
+            tokens.append({**label, "tokens": int(value)})
+    for row in caches.values():
+        total = row["hit"] + row["stale"] + row["miss"] + row["wait"]
+        row["hit_rate"] = (total - row["miss"]) / total if total else 0.0
+    return {"calls": calls, "caches": list(caches.values()), "tokens": tokens}
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """/metrics 경로로 Prometheus 텍스트를 제공하는 스레드 서버 시작"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="metrics-server", daemon=True).start()
+    return httpd
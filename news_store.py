@@ -0,0 +1,197 @@
+"""
+뉴스 벡터DB
+IngestManifest : Chroma 컬렉션 옆(PERSIST_DIRECTORY)에 적재한 기사 링크, 청크 ID, 발행일을 기록해서
+중복 확인과 기간 만료 삭제를 컬렉션 전체 조회 없이 처리
+PartitionedStore : 기사 발행일(한국시간)별로 컬렉션을 나눠 저장 ({이름}_YYYYMMDD)
+만료는 기준일 이전 컬렉션을 통째로 삭제하고, 검색은 조회 기간 안의 컬렉션만 검색해서 상위 k개를 병합
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+MANIFEST_NAME = "ingest_manifest.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS article (
+    link TEXT PRIMARY KEY,
+    publish_ts INTEGER NOT NULL,
+    chunk_ids TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS article_publish_ts ON article (publish_ts);
+"""
+
+def chunk_ids(link: str, count: int) -> List[str]:
+    """기사 링크 해시 + 청크 순번으로 만든 고정 청크 ID (다시 넣을 때는 PartitionedStore.delete_articles()로 이전 청크 삭제)"""
+    prefix = hashlib.sha1(link.encode("utf-8")).hexdigest()
+    return [f"{prefix}-{i}" for i in range(count)]
+
+class IngestManifest:
+    def __init__(self, persist_dir: str):
+        os.makedirs(persist_dir, exist_ok=True)
+        self.path = os.path.join(persist_dir, MANIFEST_NAME)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def known(self, links: Iterable[str]) -> set:
+        """이미 적재된 링크"""
+        links = list(links)
+        found = set()
+        with closing(self._connect()) as conn:
+            for i in range(0, len(links), 500): # SQLite 변수 개수 제한
+                part = links[i:i+500]
+                rows = conn.execute(f"SELECT link FROM article WHERE link IN ({','.join('?' * len(part))})", part)
+                found.update(row[0] for row in rows)
+        return found
+
+    def articles(self, links: Iterable[str]) -> Dict[str, tuple[int, List[str]]]:
+        """적재된 링크별 (발행일, 청크 ID)"""
+        links = list(links)
+        found = {}
+        with closing(self._connect()) as conn:
+            for i in range(0, len(links), 500): # SQLite 변수 개수 제한
+                part = links[i:i+500]
+                rows = conn.execute(f"SELECT link, publish_ts, chunk_ids FROM article "
+                                    f"WHERE link IN ({','.join('?' * len(part))})", part)
+                found.update((link, (ts, json.loads(ids))) for link, ts, ids in rows)
+        return found
+
+    def expired(self, cutoff_ts: int) -> Dict[str, List[str]]:
+        """발행일이 cutoff_ts보다 지난 기사 링크별 청크 ID"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT link, chunk_ids FROM article WHERE publish_ts < ?", (cutoff_ts,))
+            return {link: json.loads(ids) for link, ids in rows}
+
+    def add(self, link: str, publish_ts: int, ids: List[str]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO article VALUES (?, ?, ?)", (link, publish_ts, json.dumps(ids)))
+
+    def remove(self, links: Iterable[str]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM article WHERE link = ?", [(link,) for link in links])
+
+KOR = zoneinfo.ZoneInfo("Asia/Seoul")
+SEARCH_WORKERS = 4 # 파티션 동시 검색 수
+
+def day_start(ts: int) -> int:
+    """ts가 속한 날(한국시간) 0시의 epoch"""
+    day = datetime.fromtimestamp(ts, tz=KOR).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(day.timestamp())
+
+def lookback_start(lookback_days: int) -> int:
+    """오늘 포함 lookback_days일 전 0시(한국시간)의 epoch, 이 날짜 이전 파티션은 만료"""
+    return day_start(int((datetime.now(tz=KOR) - timedelta(days=lookback_days)).timestamp()))
+
+class PartitionedStore:
+    def __init__(self, persist_dir: str, name: str, embedding: Embeddings):
+        self.persist_dir = persist_dir
+        self.name = name
+        self.embedding = embedding
+        self.client = chromadb.PersistentClient(path=persist_dir)
+        self.manifest = IngestManifest(persist_dir)
+
+    def _partition_name(self, publish_ts: int) -> str:
+        return f"{self.name}_{datetime.fromtimestamp(publish_ts, tz=KOR):%Y%m%d}"
+
+    def _partition_day(self, collection_name: str) -> int:
+        day = datetime.strptime(collection_name.rsplit("_", 1)[1], "%Y%m%d").replace(tzinfo=KOR)
+        return int(day.timestamp())
+
+    def _vs(self, collection_name: str) -> Chroma:
+        return Chroma(client=self.client, collection_name=collection_name, embedding_function=self.embedding)
+
+    def partitions(self, since_ts: int | None = None) -> List[str]:
+        """since_ts가 속한 날 이후의 파티션 이름 (날짜순)"""
+        prefix = f"{self.name}_"
+        names = sorted(c.name for c in self.client.list_collections()
+                       if c.name.startswith(prefix) and c.name[len(prefix):].isdigit())
+        if since_ts is None:
+            return names
+        since = day_start(since_ts)
+        return [n for n in names if self._partition_day(n) >= since]
+
+    def count(self) -> int:
+        return sum(self.client.get_collection(n).count() for n in self.partitions())
+
+    def add_documents(self, chunks: List[Document]) -> None:
+        """청크를 발행일 파티션에 고정 ID로 추가 (같은 ID는 덮어씀)"""
+        groups: Dict[str, List[Document]] = {}
+        for chunk in chunks:
+            groups.setdefault(self._partition_name(chunk.metadata["publish_ts"]), []).append(chunk)
+        for collection_name, docs in groups.items():
+            self._vs(collection_name).add_documents(docs, ids=[doc.id for doc in docs])
+
+    def delete_articles(self, links: Iterable[str]) -> int:
+        """적재 목록에 있는 기사의 청크를 발행일 파티션에서 삭제하고 삭제한 청크 ID 개수 반환 (적재 목록은 그대로)"""
+        groups: Dict[str, List[str]] = {}
+        for publish_ts, ids in self.manifest.articles(links).values():
+            groups.setdefault(self._partition_name(publish_ts), []).extend(ids)
+        existing = set(self.partitions())
+        deleted = 0
+        for collection_name, ids in groups.items():
+            if collection_name in existing and ids:
+                self.client.get_collection(collection_name).delete(ids=ids)
+                deleted += len(ids)
+        return deleted
+
+    def drop_before(self, cutoff_ts: int) -> int:
+        """cutoff_ts가 속한 날 이전 파티션을 통째로 삭제하고 삭제한 청크 개수 반환"""
+        cutoff = day_start(cutoff_ts)
+        deleted = 0
+        for collection_name in self.partitions():
+            if self._partition_day(collection_name) < cutoff:
+                deleted += self.client.get_collection(collection_name).count()
+                self.client.delete_collection(collection_name)
+        self.manifest.remove(self.manifest.expired(cutoff))
+        return deleted
+
+    def search(self, query: str, k: int, since_ts: int | None = None) -> List[Document]:
+        """since_ts 이후 파티션에서 각각 상위 k개를 찾아 거리순으로 병합한 상위 k개"""
+        names = self.partitions(since_ts)
+        if not names:
+            return []
+        vector = self.embedding.embed_query(query)
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+            results = executor.map(lambda n: self._vs(n).similarity_search_by_vector_with_relevance_scores(vector, k=k), names)
+            scored = [pair for result in results for pair in result]
+        scored.sort(key=lambda pair: (pair[1], pair[0].id or ""))
+        return [doc for doc, _ in scored[:k]]
+
+    def migrate(self, legacy_name: str) -> int:
+        """파티션 이전의 단일 컬렉션이 있으면 임베딩 그대로 파티션으로 옮기고 삭제 (1회)"""
+        if legacy_name not in {c.name for c in self.client.list_collections()}:
+            return 0
+        legacy = self.client.get_collection(legacy_name)
+        data = legacy.get(include=["documents", "metadatas", "embeddings"])
+        groups: Dict[str, dict] = {}
+        links: Dict[str, tuple[int, List[str]]] = {}
+        for chunk_id, doc, meta, vector in zip(data["ids"], data["documents"], data["metadatas"], data["embeddings"]):
+            group = groups.setdefault(self._partition_name(meta["publish_ts"]),
+                                      {"ids": [], "documents": [], "metadatas": [], "embeddings": []})
+            group["ids"].append(chunk_id)
+            group["documents"].append(doc)
+            group["metadatas"].append(meta)
+            group["embeddings"].append(vector)
+            links.setdefault(meta["link"], (meta["publish_ts"], []))[1].append(chunk_id)
+        for collection_name, group in groups.items():
+            self.client.get_or_create_collection(collection_name).upsert(**group)
+        for link, (publish_ts, ids) in links.items():
+            if not self.manifest.known([link]):
+                self.manifest.add(link, publish_ts, ids)
+        self.client.delete_collection(legacy_name)
+        return len(data["ids"])
@@ -0,0 +1,59 @@
+"""
+뉴스 요약 저장소 (SQLite)
+백그라운드 작업이 만든 뉴스 요약 결과(작성시각, 출처 기사)를 저장해서 모든 사용자/프로세스가 공유
+화면에서 바로 읽을 수 있도록 llm 관련 패키지를 import하지 않음
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List
+
+NEWS_SUMMARY_PATH = "./news_summary.db"
+NEWS_SUMMARY_KEEP = 30 # 보관할 요약 개수
+NEWS_REFRESH_INTERVAL = 3 * 60 * 60 # 요약이 이보다 오래되면 다시 실행(초)
+
+class SummaryStore:
+    def __init__(self, path: str = NEWS_SUMMARY_PATH, keep: int = NEWS_SUMMARY_KEEP):
+        self.path = path
+        self.keep = keep
+        with closing(self._connect()) as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS summary (
+                                created_at REAL NOT NULL,
+                                lookback_days INTEGER NOT NULL,
+                                text TEXT NOT NULL,
+                                sources TEXT NOT NULL)""")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def latest(self) -> Dict | None:
+        """가장 최근 요약 {created_at, lookback_days, text, sources: [{title, link, publish}]}, 없으면 None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT created_at, lookback_days, text, sources FROM summary "
+                               "ORDER BY created_at DESC LIMIT 1").fetchone()
+        if row is None:
+            return None
+        created_at, lookback_days, text, sources = row
+        return {"created_at": created_at, "lookback_days": lookback_days, "text": text, "sources": json.loads(sources)}
+
+    def save(self, text: str, sources: List[Dict], lookback_days: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT INTO summary VALUES (?, ?, ?, ?)",
+                         (time.time(), lookback_days, text, json.dumps(sources, ensure_ascii=False)))
+            conn.execute("DELETE FROM summary WHERE rowid NOT IN "
+                         "(SELECT rowid FROM summary ORDER BY created_at DESC LIMIT ?)", (self.keep,))
+
+_summary_store: SummaryStore | None = None
+_lock = threading.Lock()
+
+def get_summary_store() -> SummaryStore:
+    """프로세스 공용 뉴스 요약 저장소"""
+    global _summary_store
+    with _lock:
+        if _summary_store is None:
+            _summary_store = SummaryStore()
+        return _summary_store
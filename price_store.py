@@ -0,0 +1,101 @@
+"""
+일자별 평균가격 로컬 저장소 (SQLite)
+(날짜, 지역, 유종) 단위로 저장해서 기간 조회시 저장소에 없는 날짜만 API로 채움
+"""
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+
+import pandas as pd
+
+HISTORY_DB_PATH = "./price_history.db"
+WINDOW_DAYS = 7 # 오피넷API 호출 1회당 조회되는 일수
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price (
+    date TEXT NOT NULL,
+    area TEXT NOT NULL,
+    prodcd TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (date, area, prodcd)
+);
+CREATE TABLE IF NOT EXISTS checked (
+    date TEXT NOT NULL,
+    area TEXT NOT NULL,
+    prodcd TEXT NOT NULL,
+    PRIMARY KEY (date, area, prodcd)
+);
+"""
+
+def _ymd(d: date) -> str:
+    return d.strftime("%Y%m%d")
+
+class PriceStore:
+    """
+    price : API로 받아온 일자별 평균가격
+    checked : API로 조회를 마친 날짜 (가격 데이터가 없던 날짜도 다시 호출하지 않기 위함)
+    """
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def missing_windows(self, area: str, oil: str, start_date: date, end_date: date) -> list[date]:
+        """
+        조회기간 중 저장소에 없는 날짜를 7일 단위 API 호출 기준일 목록으로 반환
+        가장 최근의 빠진 날짜를 기준일로 이전 7일을 한번에 채우는 방식
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT date FROM checked WHERE area = ? AND prodcd = ? AND date BETWEEN ? AND ?",
+                (area, oil, _ymd(start_date), _ymd(end_date))
+            ).fetchall()
+        checked = {r[0] for r in rows}
+
+        windows = []
+        day = end_date
+        while day >= start_date:
+            if _ymd(day) in checked:
+                day -= timedelta(days=1)
+                continue
+            windows.append(day)
+            day -= timedelta(days=WINDOW_DAYS)
+        return windows
+
+    def save(self, area: str, oil: str, window_end: date, rows: list[dict]) -> None:
+        """
+        API 조회결과 저장 후 조회한 7일을 checked로 기록
+        작일 이후는 아직 집계가 안됐을 수 있으므로 데이터가 있는 날짜만 기록
+        """
+        fetched = {str(r["DATE"]) for r in rows}
+        settled = date.today() - timedelta(days=1)
+        days = [window_end - timedelta(days=n) for n in range(WINDOW_DAYS)]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO price (date, area, prodcd, price) VALUES (?, ?, ?, ?)",
+                [(str(r["DATE"]), area, oil, float(r["PRICE"])) for r in rows]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO checked (date, area, prodcd) VALUES (?, ?, ?)",
+                [(_ymd(d), area, oil) for d in days if d < settled or _ymd(d) in fetched]
+            )
+
+    def query(self, areas: list[str], oil: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """저장소에서 기간 조회 (DATE, AREA_NM, PRICE, PRODCD)"""
+        placeholders = ",".join("?" * len(areas))
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                f"""
+                SELECT date AS DATE, area AS AREA_NM, price AS PRICE, prodcd AS PRODCD
+                FROM price
+                WHERE area IN ({placeholders}) AND prodcd = ? AND date BETWEEN ? AND ?
+                ORDER BY date, area
+                """,
+                conn,
+                params=[*areas, oil, _ymd(start_date), _ymd(end_date)]
+            )
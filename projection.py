@@ -0,0 +1,39 @@
+"""
+KATEC(TM128) <=> WGS84 로컬 좌표계 변환
+오피넷 API가 사용하는 KATEC 좌표는 카카오맵 API에서 'KTM'으로 부르는 좌표계와 같음
+카카오 transcoord API를 주유소마다 호출하지 않고 pyproj로 배열 단위 일괄 변환
+
+허용 오차 : 카카오 KTM 변환 결과와 25m 이내 (경위도 약 2.5e-4도)
+카카오가 쓰는 Bessel 타원체 => WGS84 변환값은 공개되어 있지 않아서, 이 값은 공개된 변환값들(3-파라미터, 7-파라미터)끼리
+국내 영역에서 서로 5~23m 차이나는 것을 기준으로 잡은 것
+실제 카카오 결과와의 오차는 bench/record_fixtures.py로 표본을 기록한 뒤 bench/check_projection.py로 확인
+"""
+from functools import lru_cache
+
+import numpy as np
+from pyproj import Transformer
+
+KATEC_PROJ = (
+    "+proj=tmerc +lat_0=38 +lon_0=128 +k=0.9999 "
+    "+x_0=400000 +y_0=600000 +ellps=bessel +units=m +no_defs "
+    "+towgs84=-115.80,474.99,674.11,1.16,-2.31,-1.63,6.43"
+)
+WGS84_CRS = "EPSG:4326"
+TOLERANCE_M = 25.0 # 카카오 KTM 변환 결과와의 허용 오차 (m)
+
+@lru_cache(maxsize=None)
+def _transformer(src: str, dst: str) -> Transformer:
+    # always_xy=True : 입출력 순서를 (경도, 위도) / (x, y)로 고정
+    return Transformer.from_crs(src, dst, always_xy=True)
+
+def katec_to_wgs84(x, y) -> tuple[np.ndarray, np.ndarray]:
+    """KATEC (x, y) 배열 => WGS84 (경도, 위도) 배열"""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    return _transformer(KATEC_PROJ, WGS84_CRS).transform(x, y)
+
+def wgs84_to_katec(lon, lat) -> tuple[np.ndarray, np.ndarray]:
+    """WGS84 (경도, 위도) 배열 => KATEC (x, y) 배열"""
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    return _transformer(WGS84_CRS, KATEC_PROJ).transform(lon, lat)
@@ -0,0 +1,63 @@
+"""
+주유소 추천 점수 계산
+가격, 거리를 0~1로 정규화하고 가중치를 적용해서 점수가 높은 순으로 정렬 (같은 입력이면 항상 같은 결과)
+"""
+import numpy as np
+import pandas as pd
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """최소값 0, 최대값 1로 정규화 (모두 같은 값이면 0)"""
+    span = values.max() - values.min()
+    if span == 0:
+        return np.zeros_like(values, dtype="float64")
+    return (values - values.min()) / span
+
+def score_stations(stations: pd.DataFrame,
+                   weight_price: float,
+                   weight_distance: float,
+                   topk: int | None = None) -> pd.DataFrame:
+    """
+    around_station_search() 결과(PRICE, DISTANCE)에 점수를 매겨 상위 topk개 반환
+    SCORE : 1 - (가격 가중치 x 정규화 가격 + 거리 가중치 x 정규화 거리) / 가중치 합, 높을수록 추천
+    REASON : 점수 근거 (최저가 대비 가격 차이, 거리)
+    점수가 같으면 가격, 거리, 주유소 ID 순으로 정렬
+    """
+    if stations.empty:
+        return stations.assign(SCORE=pd.Series(dtype="float64"), REASON=pd.Series(dtype="object"))
+
+    price = stations["PRICE"].to_numpy(dtype="float64")
+    distance = stations["DISTANCE"].to_numpy(dtype="float64")
+    total = weight_price + weight_distance
+    if total <= 0:
+        raise ValueError("가중치의 합은 0보다 커야 합니다.")
+
+    penalty = (weight_price * _normalize(price) + weight_distance * _normalize(distance)) / total
+    ranked = stations.assign(SCORE=np.round(1 - penalty, 4),
+                             PRICE_GAP=price - price.min())
+    ranked = ranked.sort_values(by=["SCORE", "PRICE", "DISTANCE", "UNI_ID"],
+                                ascending=[False, True, True, True])
+    if topk is not None:
+        ranked = ranked.head(topk)
+
+    ranked["REASON"] = [
+        f"최저가 대비 {gap:+,.0f}원, 거리 {dist:,.0f}m (점수 {score:.2f})"
+        for gap, dist, score in zip(ranked["PRICE_GAP"], ranked["DISTANCE"], ranked["SCORE"])
+    ]
+    return ranked.drop(columns="PRICE_GAP").reset_index(drop=True)
+
+def render_recommendation(best: pd.Series, detail: pd.DataFrame) -> str:
+    """LLM 없이 추천 결과를 마크다운으로 작성 (detail : station_info_search() 결과)"""
+    lines = [f"추천드리는 주유소는 **{best['OS_NM']}**입니다.", ""]
+    if detail.empty:
+        lines += [f"- 상표 : {best['POLL_DIV_CD']}",
+                  f"- 기름가격 : {best['PRODCD']} {best['PRICE']:,.0f}원"]
+    else:
+        info = detail.iloc[0]
+        prices = ", ".join(f"{row.PRODCD} {row.PRICE:,.0f}원" for row in detail.itertuples())
+        lines += [f"- 주소 : {info.get('NEW_ADR') or info.get('VAN_ADR', '')}",
+                  f"- 상표 : {info.get('POLL_DIV_CO', best['POLL_DIV_CD'])}",
+                  f"- 기름가격 : {prices}",
+                  f"- 전화번호 : {info.get('TEL', '')}",
+                  f"- 세차장 : {'있음' if info.get('CAR_WASH_YN') == 'Y' else '없음'}"]
+    lines.append(f"- 추천 근거 : {best['REASON']}")
+    return "\n".join(lines)
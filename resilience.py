@@ -0,0 +1,211 @@
+"""
+외부 API 호출 정책 (타임아웃, 재시도, 헤징, 서킷 브레이커)
+- 엔드포인트별 (연결, 응답) 타임아웃
+- 연결 오류, 타임아웃, 5xx, 429는 지수 백오프(full jitter) 후 재시도
+- hedge_after가 있는 엔드포인트는 그 시간 안에 응답이 없으면 같은 요청을 한번 더 보내고 먼저 온 응답 사용
+- 서비스별 서킷 브레이커 : 연속 failures회 실패하면 cooldown초 동안 호출하지 않고 CircuitOpen 발생
+  (ttl_cache 함수는 저장된 값이 있으면 그 값을 반환), cooldown이 지나면 1건만 시험 호출
+재시도, 헤징 요청도 scheduler의 호출 한도 토큰을 사용 (헤징은 토큰이 바로 없으면 보내지 않음)
+"""
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+import requests
+
+import metrics
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class Policy:
+    timeout: tuple[float, float] = (3.05, 10) # (연결, 응답) 초
+    retries: int = 2 # 최대 재시도 횟수
+    backoff: float = 0.2 # 첫 재시도 대기시간 상한(초), 재시도마다 2배
+    max_backoff: float = 2.0
+    hedge_after: float | None = None # 응답이 없으면 같은 요청을 한번 더 보낼 때까지 시간(초)
+
+DEFAULT_POLICY = Policy()
+
+# 카카오 좌표/주소 변환은 화면에서 기다리는 짧은 조회라 타임아웃을 짧게 두고 헤징
+# 오피넷은 일일 호출 한도가 작아서 헤징하지 않음
+POLICIES = {
+    ("kakao", "geo/transcoord.json"): Policy(timeout=(1, 3), hedge_after=0.3),
+    ("kakao", "geo/coord2regioncode.json"): Policy(timeout=(1, 3), hedge_after=0.3),
+    ("kakao", "search/address.json"): Policy(timeout=(1, 3), hedge_after=0.3),
+    ("opinet", "detailById.do"): Policy(timeout=(3.05, 5)),
+    ("opinet", "aroundAll.do"): Policy(timeout=(3.05, 10))
+}
+
+def get_policy(service: str, endpoint: str) -> Policy:
+    return POLICIES.get((service, endpoint), DEFAULT_POLICY)
+
+class CircuitOpen(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """연속 실패 횟수 기준 서킷 브레이커 (closed => open => half_open => closed)"""
+
+    def __init__(self, name: str, failures: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._count = 0 # 연속 실패 횟수
+        self._opened_at: float | None = None
+        self._probe: object | None = None # 시험 호출 중인 요청의 토큰
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def _blocked(self, remaining: float) -> CircuitOpen:
+        return CircuitOpen(f"{self.name} 호출 차단 중 (연속 {self._count}회 실패, {max(remaining, 0):.0f}초 후 재시도)")
+
+    def raise_if_open(self) -> None:
+        """cooldown 중이면 CircuitOpen (시험 호출 자리는 차지하지 않음, 호출 한도 토큰을 받기 전 확인용)"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining <= 0:
+                return
+            error = self._blocked(remaining)
+        raise error
+
+    def check(self) -> object | None:
+        """
+        호출 직전 확인, 열려 있으면 CircuitOpen (cooldown이 지났으면 1건만 통과)
+        시험 호출로 통과하면 토큰을 반환하고 호출이 끝나면 결과와 관계없이 release(토큰)
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and self._probe is None:
+                self._probe = object()
+                return self._probe
+            error = self._blocked(remaining)
+        raise error
+
+    def release(self, probe: object | None) -> None:
+        """시험 호출 자리 반납 (success, failure를 기록하지 못하고 끝난 경우 다음 요청이 시험 호출)"""
+        if probe is None:
+            return
+        with self._lock:
+            if self._probe is probe:
+                self._probe = None
+
+    def success(self) -> None:
+        with self._lock:
+            self._count = 0
+            self._opened_at = None
+            self._probe = None
+        metrics.set_gauge("oil_circuit_open", 0, service=self.name)
+
+    def failure(self) -> None:
+        with self._lock:
+            self._count += 1
+            if self._probe is not None or self._count >= self.failures:
+                self._opened_at = time.monotonic()
+            self._probe = None
+            opened = self._opened_at is not None
+        if opened:
+            metrics.set_gauge("oil_circuit_open", 1, service=self.name)
+
+    def reset(self) -> None:
+        self.success()
+
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+def get_breaker(service: str) -> CircuitBreaker:
+    """서비스별 공용 서킷 브레이커"""
+    with _lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+def retryable(e: BaseException) -> bool:
+    """재시도하면 성공할 수 있는 오류 (서킷 브레이커도 이 오류만 실패로 셈)"""
+    if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+        return e.response.status_code >= 500 or e.response.status_code == 429
+    return False
+
+def backoff(policy: Policy, attempt: int) -> float:
+    """attempt번째 재시도 전 대기시간 (0 ~ backoff * 2^(attempt-1) 사이 무작위)"""
+    return random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** (attempt - 1)))
+
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="api-hedge")
+
+def _hedged(request: Callable[[tuple], T],
+            policy: Policy,
+            acquire: Callable[[bool], bool],
+            service: str,
+            endpoint: str) -> T:
+    first = _hedge_pool.submit(request, policy.timeout)
+    done, _ = wait([first], timeout=policy.hedge_after)
+    if done or not acquire(False):
+        return first.result()
+    metrics.inc("oil_external_retries_total", service=service, endpoint=endpoint, kind="hedge")
+    pending = {first, _hedge_pool.submit(request, policy.timeout)}
+    while True: # 먼저 성공한 응답 반환, 둘 다 실패하면 마지막 오류 (늦은 요청은 끝날 때까지 두고 결과는 버림)
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+        if not pending:
+            return done.pop().result()
+
+def call(request: Callable[[tuple], T],
+         service: str,
+         endpoint: str,
+         acquire: Callable[[bool], bool] = lambda block: True) -> T:
+    """
+    request(timeout)를 정책대로 호출
+    acquire(block) : 재시도, 헤징 요청 전 호출 한도 토큰 받기 (block=False면 바로 받을 수 없을 때 False)
+    서킷 브레이커가 열려 있으면 CircuitOpen
+    """
+    policy = get_policy(service, endpoint)
+    breaker = get_breaker(service)
+    probe = breaker.check()
+    try:
+        return _call(request, service, endpoint, acquire, policy, breaker)
+    finally:
+        breaker.release(probe)
+
+def _call(request: Callable[[tuple], T],
+          service: str,
+          endpoint: str,
+          acquire: Callable[[bool], bool],
+          policy: Policy,
+          breaker: CircuitBreaker) -> T:
+    attempt = 0
+    while True:
+        try:
+            if policy.hedge_after is None:
+                result = request(policy.timeout)
+            else:
+                result = _hedged(request, policy, acquire, service, endpoint)
+        except Exception as e:
+            if not retryable(e): # 4xx 등 요청 자체의 오류 (서버는 응답함)
+                breaker.success()
+                raise
+            breaker.failure()
+            if attempt >= policy.retries or breaker.state != "closed":
+                raise
+            attempt += 1
+            metrics.inc("oil_external_retries_total", service=service, endpoint=endpoint, kind="retry")
+            time.sleep(backoff(policy, attempt))
+            acquire(True)
+            continue
+        breaker.success()
+        return result
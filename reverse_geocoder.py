@@ -0,0 +1,134 @@
+"""
+(로컬) 경도, 위도값으로 행정구역 반환
+gisdata의 시도/시군구 경계 폴리곤을 shapely STRtree로 색인해서 네트워크 없이 point-in-polygon 검색
+카카오맵 API xy_to_district()와 같은 형태(region_1depth_name, region_2depth_name)로 반환
+
+시도 경계 : ./gisdata/TL_SCCO_CTPRVN.json (CTP_KOR_NM), 자기교차 폴리곤은 읽을 때 shapely.make_valid로 고침
+시군구 경계 : ./gisdata/TL_SCCO_SIG.json (SIG_KOR_NM, CTPRVN_CD), 파일이 없으면 시군구는 찾지 못함(None)
+시군구 경계는 gisdata/build_boundaries.py로 만든 근사치 (읍면동 중심점의 보로노이 영역, 시도 경계와 겹치는 변만 정확)
+그래서 xy_to_district()는 시군구끼리 맞닿은 변에서 SIGUNGU_EDGE_MARGIN_M 안쪽이면 None 반환 (호출한 쪽에서 카카오 API 사용)
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.strtree import STRtree
+
+SIDO_PATH = "./gisdata/TL_SCCO_CTPRVN.json"
+SIGUNGU_PATH = "./gisdata/TL_SCCO_SIG.json"
+SIGUNGU_EDGE_MARGIN_M = 1500 # 근사한 시군구 경계에서 이 거리 안쪽은 시군구를 정하지 않음 (build_boundaries.py --evaluate 최대 오차 약 1.3km)
+M_PER_DEG = 111_320
+
+NAME_ALIASES = { # 오피넷 지역명 기준으로 통일
+    "강원특별자치도": "강원도",
+    "전북특별자치도": "전라북도"
+}
+
+CODE_ALIASES = { # 특별자치도 출범으로 바뀐 시도코드 => 시도 경계 파일의 코드
+    "51": "42",
+    "52": "45"
+}
+
+class _Layer:
+    """경계 폴리곤과 이름, 코드, STRtree 색인"""
+    def __init__(self, path: str, name_col: str, code_col: str):
+        gdf = gpd.read_file(path).to_crs("EPSG:4326")
+        self.names = np.array([NAME_ALIASES.get(n, n) for n in gdf[name_col]], dtype=object)
+        self.codes = np.array(gdf[code_col].astype(str), dtype=object)
+        self.geoms = shapely.make_valid(gdf.geometry.values) # 잘못된 폴리곤은 within 검색에서 빠짐
+        self.tree = STRtree(self.geoms)
+        self.edges: np.ndarray | None = None # 근사한 변 (시군구만)
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """포인트 배열이 속한 폴리곤의 인덱스 배열 반환 (없으면 -1)"""
+        result = np.full(len(points), -1, dtype="int64")
+        point_idx, poly_idx = self.tree.query(points, predicate="within")
+        result[point_idx] = poly_idx
+        return result
+
+@lru_cache(maxsize=1)
+def _layers() -> tuple[_Layer, _Layer | None]:
+    sido = _Layer(SIDO_PATH, "CTP_KOR_NM", "CTPRVN_CD")
+    sigungu = _Layer(SIGUNGU_PATH, "SIG_KOR_NM", "CTPRVN_CD") if os.path.exists(SIGUNGU_PATH) else None
+    if sigungu is not None:
+        sigungu.edges = _shared_edges(sigungu)
+    return sido, sigungu
+
+def _polygonal(geom):
+    """make_valid 결과의 GeometryCollection에서 면만 남김"""
+    if shapely.get_type_id(geom) != 7:
+        return geom
+    return shapely.union_all([p for p in shapely.get_parts(geom) if shapely.get_type_id(p) in (3, 6)])
+
+def _shared_edges(layer: _Layer) -> np.ndarray:
+    """
+    시군구별로 같은 시도의 다른 시군구와 맞닿은 변 (근사한 변)
+    해안선, 시도 사이 경계는 시도 경계 파일 그대로라 제외
+    """
+    boundaries = shapely.boundary(np.array([_polygonal(g) for g in layer.geoms]))
+    left, right = layer.tree.query(layer.geoms, predicate="intersects")
+    pair = (left < right) & (layer.codes[left] == layer.codes[right])
+    left, right = left[pair], right[pair]
+    shared = shapely.intersection(boundaries[left], boundaries[right])
+    parts = [[] for _ in layer.geoms]
+    for i, j, line in zip(left, right, shared):
+        parts[i].append(line)
+        parts[j].append(line)
+    return np.array([shapely.union_all(p) if p else shapely.GeometryCollection() for p in parts], dtype=object)
+
+def _names(layer: _Layer, idx: np.ndarray) -> np.ndarray:
+    return np.where(idx >= 0, layer.names[idx], None)
+
+def points_to_district(x, y, edge_margin: float = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    경도, 위도 배열을 한번에 (시도명 배열, 시군구명 배열)로 변환
+    시군구 경계가 있으면 시군구의 시도코드(앞 2자리)로 시도를 정하고 시군구를 못찾은 포인트만 시도 경계로 찾음
+    edge_margin(m) : 근사한 시군구 변에서 이 거리 안쪽인 포인트는 시군구를 None으로 (거리는 위도 1도 기준 근사)
+    """
+    points = shapely.points(np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64"))
+    sido, sigungu = _layers()
+    sido_names = _names(sido, sido.lookup(points))
+    if sigungu is None:
+        return sido_names, np.full(len(points), None, dtype=object)
+
+    sig_idx = sigungu.lookup(points)
+    if edge_margin > 0:
+        found = np.flatnonzero(sig_idx >= 0)
+        near = shapely.dwithin(sigungu.edges[sig_idx[found]], points[found], edge_margin / M_PER_DEG)
+        sig_idx[found[near]] = -1
+    sido_by_code = dict(zip(sido.codes, sido.names))
+    for i in np.flatnonzero(sig_idx >= 0):
+        prefix = sigungu.codes[sig_idx[i]][:2]
+        sido_names[i] = sido_by_code.get(CODE_ALIASES.get(prefix, prefix), sido_names[i])
+    return sido_names, _names(sigungu, sig_idx)
+
+def is_land(x, y) -> np.ndarray:
+    """경도, 위도 배열이 육지(시군구 경계 안)인지 여부, 시군구 경계가 없으면 FileNotFoundError"""
+    _, sigungu = _layers()
+    if sigungu is None:
+        raise FileNotFoundError(f"시군구 경계 파일 없음 : {SIGUNGU_PATH}")
+    _, sigungu_names = points_to_district(x, y)
+    return sigungu_names != None
+
+def xy_to_district(x: float, y: float) -> list[dict] | None:
+    """
+    경도, 위도값으로 행정구역 반환
+    카카오 coord2regioncode와 같이 [법정동(B), 행정동(H)] 2개를 반환
+    시도나 시군구를 못찾거나 근사한 시군구 경계 근처(SIGUNGU_EDGE_MARGIN_M)면 None 반환
+    """
+    sido_names, sigungu_names = points_to_district([float(x)], [float(y)], SIGUNGU_EDGE_MARGIN_M)
+    sido, sigungu = sido_names[0], sigungu_names[0]
+    if sido is None or sigungu is None:
+        return None
+    return [
+        {
+            "region_type": region_type,
+            "region_1depth_name": sido,
+            "region_2depth_name": sigungu,
+            "region_3depth_name": "",
+            "x": float(x),
+            "y": float(y)
+        } for region_type in ("B", "H")
+    ]
@@ -0,0 +1,218 @@
+"""
+API 요청 스케줄러 (프로세스 공용)
+client.ApiClient.get()의 모든 요청이 거쳐가며
+- 같은 요청(서비스, 엔드포인트, 파라미터)이 진행 중이면 새로 호출하지 않고 결과를 기다림 (singleflight)
+- API키(서비스)별 토큰 버킷으로 초당 호출 수를 제한하고 일일 호출 한도를 셈
+- 토큰을 기다리는 요청은 화면 요청(INTERACTIVE)을 백그라운드 갱신(BACKGROUND)보다 먼저 처리
+  일일 한도가 reserve 이하로 남으면 백그라운드 요청은 QuotaExceeded
+백그라운드 작업은 with background(): 블록 안에서 요청 (스레드마다 따로 설정해야 함)
+일일 사용량은 프로세스 메모리에만 기록하고 한국시간 0시에 초기화
+한도는 환경변수 {서비스}_RATE_LIMIT(초당 호출 수), {서비스}_DAILY_QUOTA(일일 호출 수)로 바꿀 수 있음
+"""
+import contextvars
+import copy
+import heapq
+import itertools
+import os
+import threading
+import time
+import zoneinfo
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, Iterator
+
+import metrics
+
+KOR = zoneinfo.ZoneInfo("Asia/Seoul")
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+@dataclass
+class Limit:
+    rate: float # 초당 호출 수
+    burst: int # 한번에 몰아서 호출할 수 있는 수 (버킷 크기)
+    daily: int # 일일 호출 한도
+    reserve: float = 0.2 # 화면 요청용으로 남겨둘 일일 한도 비율
+
+def _limit(service: str, rate: float, daily: int) -> Limit:
+    rate = float(os.getenv(f"{service.upper()}_RATE_LIMIT", rate))
+    return Limit(rate=rate,
+                 burst=max(int(rate * 2), 1),
+                 daily=int(os.getenv(f"{service.upper()}_DAILY_QUOTA", daily)))
+
+DEFAULT_LIMITS = {
+    "opinet": _limit("opinet", rate=10, daily=1500), # 오피넷 무료 API키 일 1,500건
+    "kakao": _limit("kakao", rate=20, daily=100000) # 카카오 로컬 API 일 100,000건
+}
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("api_priority", default=INTERACTIVE)
+
+@contextmanager
+def background() -> Iterator[None]:
+    """블록 안의 API 요청을 백그라운드 우선순위로 처리"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def _next_reset() -> float:
+    now = datetime.now(tz=KOR)
+    return (now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)).timestamp()
+
+class _Bucket:
+    def __init__(self, limit: Limit):
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+        self.used = 0
+        self.reset_at = _next_reset()
+        self.waiters: list[list] = [] # [우선순위, 순번] 힙
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.updated) * self.limit.rate)
+        self.updated = now
+        if time.time() >= self.reset_at:
+            self.used = 0
+            self.reset_at = _next_reset()
+
+    @property
+    def remaining(self) -> int:
+        return max(self.limit.daily - self.used, 0)
+
+class Scheduler:
+    def __init__(self, limits: dict[str, Limit] = DEFAULT_LIMITS):
+        self._cond = threading.Condition()
+        self._buckets = {service: _Bucket(limit) for service, limit in limits.items()}
+        self._inflight: dict[Hashable, tuple[Future, list]] = {}
+        self._seq = itertools.count()
+
+    def call(self, service: str, key: Hashable, fn: Callable[[], object]):
+        """
+        fn()을 호출 한도 안에서 실행하고 결과 반환
+        같은 key가 진행 중이면 그 결과의 복사본을 반환 (화면 요청이 기다리면 진행 중인 요청의 우선순위를 올림)
+        """
+        priority = _priority.get()
+        with self._cond:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                entry = [priority, next(self._seq)]
+                future = Future()
+                self._inflight[key] = (future, entry)
+            else:
+                future, entry = inflight
+                if priority < entry[0]:
+                    entry[0] = priority
+                    bucket = self._buckets.get(service)
+                    if bucket is not None and entry in bucket.waiters:
+                        heapq.heapify(bucket.waiters)
+                    self._cond.notify_all()
+        if inflight is not None:
+            metrics.record_cache(f"{service}_inflight", "wait")
+            return copy.deepcopy(future.result())
+        metrics.record_cache(f"{service}_inflight", "miss")
+
+        try:
+            self._acquire(service, entry)
+            value = fn()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+
+    def acquire(self, service: str, block: bool = True) -> bool:
+        """
+        call() 밖에서 토큰 1개 받기 (재시도, 헤징 요청용)
+        block=False면 기다리지 않고 토큰이 없거나 일일 한도가 reserve 이하로 남았으면 False
+        """
+        if block:
+            self._acquire(service, [_priority.get(), next(self._seq)])
+            return True
+        bucket = self._buckets.get(service)
+        if bucket is None:
+            return True
+        with self._cond:
+            bucket.refill()
+            if bucket.waiters or bucket.tokens < 1 or bucket.remaining <= bucket.limit.daily * bucket.limit.reserve:
+                return False
+            bucket.tokens -= 1
+            bucket.used += 1
+            return True
+
+    def _acquire(self, service: str, entry: list) -> None:
+        """토큰 1개를 받을 때까지 대기 (우선순위, 도착 순서대로)"""
+        bucket = self._buckets.get(service)
+        if bucket is None:
+            return
+        start = time.perf_counter()
+        with self._cond:
+            heapq.heappush(bucket.waiters, entry)
+            try:
+                while True:
+                    bucket.refill()
+                    reserve = bucket.limit.daily * bucket.limit.reserve if entry[0] == BACKGROUND else 0
+                    if bucket.remaining <= reserve:
+                        raise QuotaExceeded(f"{service} 일일 호출 한도 초과 (남은 호출 {bucket.remaining}회)")
+                    if bucket.waiters[0] is entry and bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        bucket.used += 1
+                        break
+                    timeout = (1 - bucket.tokens) / bucket.limit.rate if bucket.waiters[0] is entry else None
+                    self._cond.wait(timeout)
+            finally:
+                bucket.waiters.remove(entry)
+                heapq.heapify(bucket.waiters)
+                self._cond.notify_all()
+            remaining = bucket.remaining
+        metrics.set_gauge("oil_api_quota_remaining", remaining, service=service)
+        metrics.observe("oil_api_queue_seconds", time.perf_counter() - start,
+                        service=service, priority="background" if entry[0] == BACKGROUND else "interactive")
+
+    def background_budget(self, service: str) -> tuple[int, float]:
+        """백그라운드 요청이 오늘 더 쓸 수 있는 호출 수(reserve 제외)와 일일 한도 초기화까지 남은 시간(초)"""
+        bucket = self._buckets.get(service)
+        if bucket is None:
+            return 0, 0.0
+        with self._cond:
+            bucket.refill()
+            spare = bucket.remaining - int(bucket.limit.daily * bucket.limit.reserve)
+            return max(spare, 0), max(bucket.reset_at - time.time(), 0.0)
+
+    def status(self) -> list[dict]:
+        """서비스별 일일 한도, 사용량, 남은 호출 수, 현재 토큰 수, 대기 중인 요청 수, 초기화 시각"""
+        rows = []
+        with self._cond:
+            for service, bucket in self._buckets.items():
+                bucket.refill()
+                rows.append({
+                    "service": service,
+                    "daily": bucket.limit.daily,
+                    "used": bucket.used,
+                    "remaining": bucket.remaining,
+                    "tokens": round(bucket.tokens, 1),
+                    "waiting": len(bucket.waiters),
+                    "reset_at": datetime.fromtimestamp(bucket.reset_at, tz=KOR).isoformat()
+                })
+        return rows
+
+_scheduler: Scheduler | None = None
+_lock = threading.Lock()
+
+def get_scheduler() -> Scheduler:
+    """프로세스 공용 스케줄러"""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
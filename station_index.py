@@ -0,0 +1,189 @@
+"""
+(로컬) 주유소 공간 색인
+오피넷 aroundAll 조회결과를 주유소 테이블(ID, 상표, 좌표, 유종별 가격)로 모아 SQLite에 저장하고
+WGS84 좌표를 단위구 좌표로 바꿔 KD-tree로 색인해서 반경 검색을 메모리에서 처리
+조회했던 원(중심, 반경, 유종, 조회시각)을 같이 기록해서 검색 반경이 최근 조회된 영역에 모두 포함될 때만 로컬 결과를 사용
+거리는 하버사인 공식으로 계산 (오피넷 DISTANCE는 KATEC 평면거리라 수 m 차이가 날 수 있음)
+"""
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from cache import STATION_TTL # 로컬 검색에 사용할 가격의 최대 나이 (around_station_search 캐시와 같음)
+
+STATION_INDEX_PATH = "./station_index.db"
+EARTH_RADIUS_M = 6_371_008.8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS station (
+    uni_id TEXT PRIMARY KEY,
+    poll_div_cd TEXT,
+    os_nm TEXT,
+    gis_x REAL,
+    gis_y REAL,
+    lon REAL NOT NULL,
+    lat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS price (
+    uni_id TEXT NOT NULL,
+    prodcd TEXT NOT NULL,
+    price REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (uni_id, prodcd)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    lon REAL NOT NULL,
+    lat REAL NOT NULL,
+    radius REAL NOT NULL,
+    prodcd TEXT NOT NULL,
+    harvested_at REAL NOT NULL,
+    PRIMARY KEY (lon, lat, radius, prodcd)
+);
+"""
+
+def haversine(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """두 경도, 위도 배열 사이의 거리(m)"""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+def _unit_xyz(lon, lat) -> np.ndarray:
+    lon, lat = np.radians(np.asarray(lon, dtype="float64")), np.radians(np.asarray(lat, dtype="float64"))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _ring(lon: float, lat: float, radius: float, n: int = 16) -> tuple[np.ndarray, np.ndarray]:
+    """원의 중심, 반지름 절반 지점, 원주 위의 표본 좌표 (포함 여부 검사용)"""
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    dist = np.concatenate([[0.0], np.full(n, radius / 2), np.full(n, radius)])
+    angles = np.concatenate([[0.0], angles, angles])
+    d_lat = np.degrees(dist * np.cos(angles) / EARTH_RADIUS_M)
+    d_lon = np.degrees(dist * np.sin(angles) / (EARTH_RADIUS_M * np.cos(np.radians(lat))))
+    return lon + d_lon, lat + d_lat
+
+class StationIndex:
+    def __init__(self, path: str = STATION_INDEX_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.stations: dict[str, dict] = {}
+        self.prices: dict[tuple[str, str], tuple[float, float]] = {}
+        self.coverage: dict[tuple[float, float, float, str], float] = {}
+        self._tree: cKDTree | None = None
+        self._ids: list[str] = []
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            self._load(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _load(self, conn: sqlite3.Connection) -> None:
+        for uni_id, poll, name, gis_x, gis_y, lon, lat in conn.execute("SELECT * FROM station"):
+            self.stations[uni_id] = {
+                "UNI_ID": uni_id,
+                "POLL_DIV_CD": poll,
+                "OS_NM": name,
+                "GIS_X_COOR": gis_x,
+                "GIS_Y_COOR": gis_y,
+                "LON_WGS84": lon,
+                "LAT_WGS84": lat
+            }
+        for uni_id, prodcd, price, updated_at in conn.execute("SELECT * FROM price"):
+            self.prices[(uni_id, prodcd)] = (price, updated_at)
+        for lon, lat, radius, prodcd, harvested_at in conn.execute("SELECT * FROM coverage"):
+            self.coverage[(lon, lat, radius, prodcd)] = harvested_at
+
+    def _build_tree(self) -> cKDTree | None:
+        if self._tree is None and self.stations:
+            self._ids = list(self.stations)
+            rows = [self.stations[i] for i in self._ids]
+            self._tree = cKDTree(_unit_xyz([r["LON_WGS84"] for r in rows], [r["LAT_WGS84"] for r in rows]))
+        return self._tree
+
+    def add(self, lon: float, lat: float, radius: float, prodcd: str, oils: list[dict]) -> None:
+        """aroundAll 조회결과(WGS84 변환 후)와 조회한 영역 저장"""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            for oil in oils:
+                station = {
+                    "UNI_ID": oil["UNI_ID"],
+                    "POLL_DIV_CD": oil["POLL_DIV_CD"],
+                    "OS_NM": oil["OS_NM"],
+                    **{key: float(oil[key]) for key in ("GIS_X_COOR", "GIS_Y_COOR", "LON_WGS84", "LAT_WGS84")}
+                }
+                if self.stations.get(oil["UNI_ID"]) != station:
+                    self.stations[oil["UNI_ID"]] = station
+                    self._tree = None
+                self.prices[(oil["UNI_ID"], prodcd)] = (float(oil["PRICE"]), now)
+            self.coverage[(lon, lat, float(radius), prodcd)] = now
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO station VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [tuple(self.stations[o["UNI_ID"]].values()) for o in oils]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO price VALUES (?, ?, ?, ?)",
+                [(o["UNI_ID"], prodcd, float(o["PRICE"]), now) for o in oils]
+            )
+            conn.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?)",
+                         (lon, lat, float(radius), prodcd, now))
+
+    def is_covered(self, lon: float, lat: float, radius: float, prodcd: str,
+                   max_age: float = STATION_TTL) -> bool:
+        """검색 원이 최근(max_age 이내) 조회한 원들의 합집합에 포함되는지 (표본 좌표로 근사)"""
+        now = time.time()
+        with self._lock:
+            circles = np.array([(c_lon, c_lat, c_radius) for (c_lon, c_lat, c_radius, c_prod), ts
+                                in self.coverage.items() if c_prod == prodcd and now - ts < max_age])
+        if not len(circles):
+            return False
+        s_lon, s_lat = _ring(lon, lat, radius)
+        dist = haversine(s_lon[:, None], s_lat[:, None], circles[None, :, 0], circles[None, :, 1])
+        return bool(np.all(np.any(dist <= circles[None, :, 2], axis=1)))
+
+    def query(self, lon: float, lat: float, radius: float, prodcd: str, sort: int,
+              max_age: float = STATION_TTL) -> list[dict] | None:
+        """
+        반경내 주유소 검색 (aroundAll과 같은 컬럼)
+        검색 영역이 최근 조회된 영역에 포함되지 않으면 None 반환
+        sort : 1 가격순, 2 거리순
+        """
+        if not self.is_covered(lon, lat, radius, prodcd, max_age):
+            return None
+        now = time.time()
+        with self._lock:
+            tree = self._build_tree()
+            if tree is None:
+                return []
+            chord = 2 * np.sin(radius / (2 * EARTH_RADIUS_M)) # 단위구에서 반경에 해당하는 직선거리
+            idx = tree.query_ball_point(_unit_xyz([lon], [lat])[0], chord)
+            rows = []
+            for i in idx:
+                station = self.stations[self._ids[i]]
+                price = self.prices.get((station["UNI_ID"], prodcd))
+                if price is not None and now - price[1] < max_age: # 최근 조회에서 빠진 주유소(폐업 등)는 제외
+                    rows.append({**station, "PRICE": price[0]})
+        if not rows:
+            return []
+
+        distance = haversine(lon, lat,
+                             np.array([r["LON_WGS84"] for r in rows]),
+                             np.array([r["LAT_WGS84"] for r in rows]))
+        for row, d in zip(rows, distance):
+            row["DISTANCE"] = round(float(d), 1)
+            row["PRODCD"] = prodcd
+        rows = [r for r in rows if r["DISTANCE"] <= radius]
+        key = (lambda r: (r["PRICE"], r["DISTANCE"])) if sort == 1 else (lambda r: r["DISTANCE"])
+        return sorted(rows, key=key)
+
+    def stale_circles(self, max_age: float = STATION_TTL) -> list[tuple[float, float, float, str]]:
+        """가격 갱신이 필요한 조회 영역 (오래된 순)"""
+        now = time.time()
+        with self._lock:
+            stale = [(ts, key) for key, ts in self.coverage.items() if now - ts >= max_age]
+        return [key for ts, key in sorted(stale)]